@@ -1,27 +1,105 @@
+import os
+import threading
+import time
 from flask import Flask
 from flask_jwt_extended import JWTManager
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, OperationalError
 from .models import db, bcrypt, Role, Mahasiswa, Dosen, Kelas
-from .routes import auth, projects, tasks, mahasiswa, dosen, role, kelas
+from .routes import auth, projects, tasks, mahasiswa, dosen, role, kelas, jobs, changes, stream, me, batch
+from .archive import init_id_counters
+from .events import init_events
+from .jobs import init_jobs
+from .utils.access_log import init_access_log
+from .utils.compression import init_compression
+from .utils.drivers import mysql_database_uri
+from .utils.profiler import init_profiler
+from .utils.rate_limit import init_rate_limit
+from .utils.single_flight import init_single_flight
+from .utils.json_provider import FastJSONProvider
+from .cli import register_cli
 from config import Config
-from flask_migrate import Migrate
+
+DEFAULT_ROLES = ['Admin', 'Dosen', 'Mahasiswa']
 
 def create_roles():
-    roles = ['Admin', 'Dosen', 'Mahasiswa']
-    with db.session.begin():
-        for role_name in roles:
-            role = Role.query.filter_by(name=role_name).first()
-            if not role:
-                new_role = Role(name=role_name)
-                db.session.add(new_role)
+    """Seed role default secara idempotent: satu SELECT + satu INSERT bila perlu"""
+    existing = set(db.session.execute(
+        select(Role.name).where(Role.name.in_(DEFAULT_ROLES))
+    ).scalars())
+    missing = [{'name': name} for name in DEFAULT_ROLES if name not in existing]
+    if not missing:
+        return 0
+
+    try:
+        db.session.execute(Role.__table__.insert(), missing)
+        db.session.commit()
+    except IntegrityError:
+        # Worker lain sudah lebih dulu membuat role yang sama
+        db.session.rollback()
+        return 0
+    return len(missing)
+
+def init_role_seeding(app):
+    """Seed role pada request pertama, bukan saat boot worker"""
+    if not app.config.get('SEED_ROLES_ON_FIRST_REQUEST', True):
+        return
+
+    state = {'done': False}
+    lock = threading.Lock()
+
+    @app.before_request
+    def seed_roles_once():
+        if state['done']:
+            return
+        with lock:
+            if state['done']:
+                return
+            try:
+                create_roles()
+            except OperationalError:
+                # DB belum siap; coba lagi di request berikutnya
+                db.session.rollback()
+                app.logger.warning('Role seeding failed, will retry on next request', exc_info=True)
+                return
+            state['done'] = True
+
+def reset_db_pool(app):
+    """Buang koneksi pool warisan proses induk; dipanggil di worker setelah fork"""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
 
 def create_app():
+    started = time.perf_counter()
+
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = mysql_database_uri(
+        app.config['SQLALCHEMY_DATABASE_URI'], app.config.get('MYSQL_DRIVER', 'auto')
+    )
+    app.json = FastJSONProvider(app)
 
     db.init_app(app)
     bcrypt.init_app(app)
     jwt = JWTManager(app)
-    migrate = Migrate(app, db)
+
+    # Flask-Migrate menarik alembic (~100ms import); hanya perlu untuk `flask db ...`
+    if os.environ.get('FLASK_RUN_FROM_CLI') == 'true':
+        from flask_migrate import Migrate
+        migrate = Migrate(app, db)
+    # Paling awal: latency mencakup hook lain, ukuran response sudah final (terkompresi)
+    init_access_log(app)
+    init_compression(app)
+    # Setelah kompresi: after_request berjalan terbalik, envelope profil ikut dikompres
+    init_profiler(app)
+    init_role_seeding(app)
+    init_id_counters(app)
+    init_rate_limit(app)
+    init_single_flight(app)
+    init_events(app)
+    init_jobs(app)
+    register_cli(app)
 
     app.register_blueprint(auth.bp, url_prefix='/auth')
     app.register_blueprint(role.bp, url_prefix='/roles')
@@ -30,9 +108,15 @@ def create_app():
     app.register_blueprint(mahasiswa.bp, url_prefix='/mahasiswa') 
     app.register_blueprint(dosen.bp, url_prefix='/dosen')
     app.register_blueprint(kelas.bp, url_prefix='/kelas')
+    app.register_blueprint(jobs.bp, url_prefix='/jobs')
+    app.register_blueprint(changes.bp, url_prefix='/changes')
+    app.register_blueprint(stream.bp, url_prefix='/stream')
+    app.register_blueprint(me.bp, url_prefix='/me')
+    app.register_blueprint(batch.bp, url_prefix='/batch')
 
-    # Buat role saat aplikasi dijalankan
-    with app.app_context():
-        create_roles()
+    # Tidak ada akses DB di sini; role di-seed lewat `flask seed-roles`
+    # atau otomatis pada request pertama
+    app.config['STARTUP_TIME_MS'] = (time.perf_counter() - started) * 1000
+    app.logger.debug('create_app finished in %.1f ms', app.config['STARTUP_TIME_MS'])
 
     return app
@@ -0,0 +1,113 @@
+"""Arsip project Completed beserta task-nya.
+
+Project berstatus Completed yang end_date-nya lebih lama dari N hari
+dipindahkan per batch ke `archived_project` / `archived_task` (INSERT ...
+SELECT lalu DELETE dalam satu transaksi), sehingga tabel `task` yang
+dibaca setiap request tetap kecil. Data arsip masih bisa dibaca lewat
+`?include_archived=true` di endpoint project dan task. Baris arsip
+memegang id aslinya; tabel project/task memakai AUTOINCREMENT agar id
+tersebut tidak dipakai ulang oleh baris baru.
+
+MySQL < 8.0 tidak menyimpan counter AUTO_INCREMENT: setelah server
+restart counter dihitung ulang dari MAX(id) + 1 tabel aktif, sehingga id
+yang sudah diarsipkan bisa terpakai lagi. Untuk versi itu counter
+ditegaskan ulang (`reassert_id_counters`) pada request pertama setiap
+proses dan setiap kali arsip berjalan. Restart server MySQL tanpa restart
+aplikasi tetap menyisakan celah sampai arsip berikutnya; pakai MySQL 8.0+
+(atau MariaDB 10.2.4+) untuk jaminan penuh.
+"""
+import threading
+from datetime import date, datetime, timedelta
+from sqlalchemy import delete, func, insert, literal, select, text
+from sqlalchemy.exc import OperationalError
+from .changes import record_deletes
+from .models import db, Project, Task, ArchivedProject, ArchivedTask
+from .serializers import PROJECT_FIELDS, PROJECT_COLUMNS, TASK_FIELDS, TASK_COLUMNS
+
+
+def reassert_id_counters():
+    """MySQL < 8.0: set AUTO_INCREMENT project/task melewati id aktif dan arsip.
+
+    Return False (tanpa query) untuk database lain.
+    """
+    dialect = db.session.connection().dialect
+    if dialect.name != 'mysql' or dialect.server_version_info >= (8, 0):
+        return False
+    for model, archived in ((Project, ArchivedProject), (Task, ArchivedTask)):
+        next_id = max(
+            db.session.execute(select(func.coalesce(func.max(model.id), 0))).scalar(),
+            db.session.execute(select(func.coalesce(func.max(archived.id), 0))).scalar(),
+        ) + 1
+        # Counter tidak pernah turun di bawah MAX(id) + 1, jadi aman terhadap INSERT bersamaan
+        db.session.execute(text(f'ALTER TABLE {model.__tablename__} AUTO_INCREMENT = {next_id}'))
+    db.session.commit()
+    return True
+
+
+def init_id_counters(app):
+    """Tegaskan counter AUTO_INCREMENT sekali per proses, pada request pertama"""
+    state = {'done': False}
+    lock = threading.Lock()
+
+    @app.before_request
+    def reassert_id_counters_once():
+        if state['done']:
+            return
+        with lock:
+            if state['done']:
+                return
+            try:
+                reassert_id_counters()
+            except OperationalError:
+                db.session.rollback()
+                app.logger.warning('Reasserting id counters failed, will retry on next request', exc_info=True)
+                return
+            state['done'] = True
+
+
+def archive_batch(cutoff, batch_size):
+    """Pindahkan maksimal batch_size project; return (jumlah project, jumlah task)"""
+    # FOR UPDATE menahan INSERT task baru ke project yang sedang dipindah
+    project_ids = db.session.execute(
+        select(Project.id)
+        .where(Project.status == 'Completed', Project.end_date < cutoff)
+        .order_by(Project.id)
+        .limit(batch_size)
+        .with_for_update()
+    ).scalars().all()
+    if not project_ids:
+        db.session.rollback()
+        return 0, 0
+
+    now = literal(datetime.utcnow(), db.DateTime)
+    db.session.execute(insert(ArchivedProject).from_select(
+        [*PROJECT_FIELDS, 'archived_at'],
+        select(*PROJECT_COLUMNS, now).where(Project.id.in_(project_ids))
+    ))
+    tasks = db.session.execute(insert(ArchivedTask).from_select(
+        [*TASK_FIELDS, 'archived_at'],
+        select(*TASK_COLUMNS, now).where(Task.project_id.in_(project_ids))
+    )).rowcount
+
+    record_deletes(Task, Task.project_id.in_(project_ids))
+    record_deletes(Project, Project.id.in_(project_ids))
+    db.session.execute(delete(Task).where(Task.project_id.in_(project_ids)))
+    db.session.execute(delete(Project).where(Project.id.in_(project_ids)))
+    db.session.commit()
+    return len(project_ids), tasks
+
+
+def archive_projects(days, batch_size, progress=None):
+    """Arsipkan semua project yang memenuhi syarat, satu transaksi per batch"""
+    cutoff = date.today() - timedelta(days=days)
+    reassert_id_counters()
+    total_projects = total_tasks = 0
+    while True:
+        projects, tasks = archive_batch(cutoff, batch_size)
+        if not projects:
+            break
+        total_projects += projects
+        total_tasks += tasks
+        if progress is not None:
+            progress(total_projects)
+    return {'archived_projects': total_projects, 'archived_tasks': total_tasks, 'cutoff': cutoff}
@@ -0,0 +1,219 @@
+"""Mode serving ASGI dengan SQLAlchemy async untuk route read-heavy.
+
+Route GET yang terdaftar di ASYNC_VIEWS (projects, tasks, kelas, changes) dilayani
+langsung di event loop memakai AsyncSession, sehingga satu proses bisa
+menahan banyak polling dashboard sekaligus tanpa satu thread per
+request. Routing, autentikasi JWT, hook before/after_request, error
+handler dan bentuk response tetap milik aplikasi Flask yang sama; query
+dan serializer-nya juga sama persis (lihat app/queries.py). Request lain
+diteruskan ke aplikasi Flask lewat WsgiToAsgi (thread pool).
+
+    uvicorn asgi:app --workers 4
+
+Butuh paket `asgiref` dan driver async (`aiomysql` untuk MySQL,
+`aiosqlite` untuk SQLite lokal).
+"""
+import asyncio
+import contextvars
+import io
+import sys
+from flask import request
+from flask_jwt_extended import verify_jwt_in_request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from werkzeug.exceptions import NotFound
+from . import create_app
+from .models import sqlite_foreign_keys_on
+from .queries import run_async
+from .routes.query_views import QUERY_VIEWS
+from .utils.single_flight import flight_key, serialized, shared_response
+
+ASYNC_DRIVERS = {
+    'mysql': 'mysql+aiomysql',
+    'mysql+pymysql': 'mysql+aiomysql',
+    'mysql+mysqldb': 'mysql+aiomysql',
+    'sqlite': 'sqlite+aiosqlite',
+    'sqlite+pysqlite': 'sqlite+aiosqlite',
+}
+
+
+# endpoint Flask -> fungsi(view_args) yang mengembalikan query generator
+ASYNC_VIEWS = QUERY_VIEWS
+
+
+def async_database_uri(config):
+    """ASYNC_DATABASE_URL, atau SQLALCHEMY_DATABASE_URI dengan driver async padanannya"""
+    if config.get('ASYNC_DATABASE_URL'):
+        return config['ASYNC_DATABASE_URL']
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def build_environ(scope):
+    """WSGI environ minimal dari scope ASGI (request GET tanpa body)"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode('latin1'),
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('ascii'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin1')
+        value = value.decode('latin1')
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'content-length':
+            environ['CONTENT_LENGTH'] = value
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+class AsyncApp:
+    """Aplikasi ASGI: route di ASYNC_VIEWS native async, sisanya ke Flask"""
+
+    def __init__(self, flask_app):
+        from asgiref.wsgi import WsgiToAsgi
+
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.engine = None
+        self.sessionmaker = None
+
+    def start(self):
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        if self.engine is None:
+            config = self.flask_app.config
+            self.engine = create_async_engine(
+                async_database_uri(config), **config.get('ASYNC_ENGINE_OPTIONS', {})
+            )
+            if self.engine.dialect.name == 'sqlite':
+                event.listen(self.engine.sync_engine, 'connect', sqlite_foreign_keys_on)
+            self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def stop(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.stop()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            return await self.wsgi(scope, receive, send)
+
+        ctx = self.flask_app.request_context(build_environ(scope))
+        ctx.push()
+        try:
+            view = None
+            if request.routing_exception is None:
+                view = ASYNC_VIEWS.get(request.endpoint)
+            if view is not None:
+                response = await self.dispatch(view)
+        finally:
+            ctx.pop()
+
+        if view is None:
+            return await self.wsgi(scope, receive, send)
+        await self.send_response(response, send)
+
+    async def dispatch(self, view):
+        """Padanan full_dispatch_request untuk view async.
+
+        Hook before_request sinkron (rate limit, seeding role, ...) bisa
+        menyentuh DB/Redis, jadi dijalankan di thread pool agar event loop
+        tidak terblokir. Hook boleh mengisi contextvars (penghitung query
+        access log), maka thread, view dan after_request berbagi satu Context.
+        """
+        app = self.flask_app
+        context = contextvars.copy_context()
+        try:
+            rv = await asyncio.get_running_loop().run_in_executor(
+                None, context.run, app.preprocess_request
+            )
+            if rv is None:
+                # Task menyalin context yang aktif saat dibuat, yaitu `context`
+                rv = await context.run(asyncio.ensure_future, self.verified_call(view))
+        except Exception as e:
+            rv = context.run(self.handle_error, e)
+        return context.run(lambda: app.process_response(app.make_response(rv)))
+
+    async def verified_call(self, view):
+        verify_jwt_in_request()
+        return await self.call_view(view)
+
+    def handle_error(self, e):
+        try:
+            return self.flask_app.handle_user_exception(e)
+        except Exception as e:
+            return self.flask_app.handle_exception(e)
+
+    async def run_view(self, view):
+        rv = view(**request.view_args)
+        if not isinstance(rv, tuple):
+            self.start()
+            async with self.sessionmaker() as session:
+                rv = await run_async(rv, session)
+            if rv is None:
+                raise NotFound()
+        return rv
+
+    async def call_view(self, view):
+        """Jalankan view; request identik yang bersamaan berbagi satu eksekusi (single-flight)"""
+        app = self.flask_app
+        single_flight = app.extensions.get('single_flight')
+        options = getattr(app.view_functions[request.endpoint], 'single_flight', None)
+        if single_flight is None or options is None:
+            return await self.run_view(view)
+
+        async def compute():
+            return serialized(await self.run_view(view))
+        return shared_response(await single_flight.do_async(flight_key(**options), compute))
+
+    async def send_response(self, response, send):
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': response.status_code,
+                'headers': [
+                    (name.lower().encode('latin1'), value.encode('latin1'))
+                    for name, value in response.headers.items()
+                ],
+            })
+            for chunk in response.iter_encoded():
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            response.close()
+
+
+def create_asgi_app():
+    """Factory ASGI, padanan create_app() untuk server async"""
+    return AsyncApp(create_app())
@@ -0,0 +1,40 @@
+"""Pencatatan perubahan untuk GET /changes (sinkronisasi inkremental klien).
+
+Insert/update tercatat lewat kolom `updated_at` (ter-index bersama id) di
+task, project dan kelas; penghapusan dicatat sebagai baris `tombstone`
+dalam transaksi yang sama dengan DELETE-nya. Cursor feed adalah posisi
+(timestamp, sumber, id) perubahan terakhir yang sudah diterima klien.
+"""
+import base64
+from datetime import datetime
+from sqlalchemy import insert, literal, select
+from .models import db, Task, Project, Kelas, Tombstone, Timestamp
+
+ENTITIES = {Project: 'project', Kelas: 'kelas', Task: 'task'}
+
+
+def record_deletes(model, *criteria):
+    """INSERT ... SELECT tombstone untuk baris yang akan dihapus; panggil sebelum DELETE"""
+    return db.session.execute(
+        insert(Tombstone).from_select(
+            ['entity', 'entity_id', 'deleted_at'],
+            select(literal(ENTITIES[model]), model.id, literal(datetime.utcnow(), Timestamp))
+            .where(*criteria)
+        )
+    ).rowcount
+
+
+def encode_cursor(position):
+    changed_at, source, id = position
+    raw = f'{changed_at.isoformat()}|{source}|{id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Cursor -> (changed_at, source, id); ValueError bila tidak valid"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        changed_at, source, id = raw.split('|')
+        return datetime.fromisoformat(changed_at), int(source), int(id)
+    except (TypeError, UnicodeDecodeError, ValueError):
+        raise ValueError(f'Invalid cursor: {cursor}')
@@ -0,0 +1,38 @@
+import click
+
+
+def register_cli(app):
+    """Daftarkan perintah `flask ...` milik aplikasi"""
+
+    @app.cli.command('seed-roles')
+    def seed_roles():
+        """Buat role default (Admin, Dosen, Mahasiswa) bila belum ada."""
+        from . import create_roles
+
+        created = create_roles()
+        click.echo(f'{created} role(s) created')
+
+    @app.cli.command('archive-projects')
+    @click.option('--days', type=int, default=None, help='Umur minimal (hari sejak end_date) project Completed (default ARCHIVE_AFTER_DAYS).')
+    @click.option('--batch-size', type=int, default=None, help='Jumlah project per transaksi (default ARCHIVE_BATCH_SIZE).')
+    def archive_projects_command(days, batch_size):
+        """Pindahkan project Completed lama beserta task-nya ke tabel arsip."""
+        from .archive import archive_projects
+
+        result = archive_projects(
+            app.config['ARCHIVE_AFTER_DAYS'] if days is None else days,
+            batch_size or app.config['ARCHIVE_BATCH_SIZE'],
+            progress=lambda archived: click.echo(f'{archived} project(s) archived')
+        )
+        click.echo(f"Done: {result['archived_projects']} project(s), {result['archived_tasks']} task(s) archived")
+
+    @app.cli.command('worker')
+    @click.option('--concurrency', type=int, default=None, help='Jumlah job yang berjalan bersamaan (default JOB_WORKERS).')
+    @click.option('--poll-interval', type=float, default=None, help='Jeda (detik) saat antrean kosong (default JOB_POLL_INTERVAL).')
+    def worker(concurrency, poll_interval):
+        """Jalankan background job dari tabel job."""
+        from .jobs import JobRunner
+
+        runner = JobRunner(app, concurrency or app.config.get('JOB_WORKERS', 2))
+        click.echo(f'Worker started with {runner.workers} slot(s)')
+        runner.run_forever(poll_interval or app.config.get('JOB_POLL_INTERVAL', 1.0))
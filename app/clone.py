@@ -0,0 +1,73 @@
+"""Clone project beserta task-nya untuk semester/kelas baru.
+
+Project baru dibuat lewat ORM (butuh id-nya), lalu semua task disalin
+dengan satu INSERT ... SELECT: due_date digeser N hari di database dan
+kelas_id dipetakan lewat CASE. Semua dalam satu transaksi, sehingga
+jumlah round trip tidak bergantung pada jumlah task.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import Integer, case, insert, literal, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from .models import db, Project, Task
+
+
+class shift_days(FunctionElement):
+    """`tanggal + n hari` yang portable antar dialect"""
+    type = db.Date()
+    name = 'shift_days'
+    inherit_cache = True
+
+
+@compiles(shift_days)
+def _shift_days(element, compiler, **kw):
+    # PostgreSQL: date + integer = date
+    value, days = element.clauses
+    return f'({compiler.process(value, **kw)} + {compiler.process(days, **kw)})'
+
+
+@compiles(shift_days, 'mysql')
+def _shift_days_mysql(element, compiler, **kw):
+    value, days = element.clauses
+    return f'DATE_ADD({compiler.process(value, **kw)}, INTERVAL {compiler.process(days, **kw)} DAY)'
+
+
+@compiles(shift_days, 'sqlite')
+def _shift_days_sqlite(element, compiler, **kw):
+    value, days = element.clauses
+    return f"DATE({compiler.process(value, **kw)}, {compiler.process(days, **kw)} || ' days')"
+
+
+def clone_project(source, days=0, kelas_map=None, name=None, status='Not Started'):
+    """Salin `source` (Project) dan task-nya; return (project baru, jumlah task).
+
+    Tidak meng-commit; pemanggil yang menutup transaksi.
+    """
+    shift = timedelta(days=days)
+    project = Project(
+        name=name or source.name,
+        description=source.description,
+        start_date=source.start_date + shift,
+        end_date=source.end_date + shift,
+        status=status,
+    )
+    db.session.add(project)
+    db.session.flush()
+
+    kelas_id = Task.kelas_id
+    if kelas_map:
+        kelas_id = case(kelas_map, value=Task.kelas_id, else_=Task.kelas_id)
+
+    tasks = db.session.execute(insert(Task).from_select(
+        ['project_id', 'kelas_id', 'title', 'description', 'status', 'due_date', 'updated_at'],
+        select(
+            literal(project.id, Integer),
+            kelas_id,
+            Task.title,
+            Task.description,
+            literal(Task.status.default.arg, Task.status.type),
+            shift_days(Task.due_date, literal(days, Integer)),
+            literal(datetime.utcnow(), Task.updated_at.type),
+        ).where(Task.project_id == source.id).order_by(Task.id)
+    )).rowcount
+    return project, tasks
@@ -0,0 +1,198 @@
+"""Pub/sub in-process untuk stream SSE perubahan task.
+
+Handler tulis memanggil `publish()` setelah commit; event dikirim ke
+topik `kelas:<id>` dan `project:<id>`. Hub meneruskan event ke queue
+setiap subscriber yang berukuran tetap (EVENTS_QUEUE_SIZE): subscriber
+yang tertinggal tidak menahan publisher, melainkan diberi event `resync`
+agar klien memuat ulang datanya.
+
+Backend menentukan jangkauan event:
+
+    local  - hanya subscriber di proses yang sama (default)
+    redis  - lewat Redis pub/sub, sampai ke semua worker (paket `redis`)
+
+Setiap stream yang terbuka menahan satu thread worker (gthread), jadi
+naikkan THREADS sesuai jumlah koneksi stream yang diharapkan.
+"""
+import logging
+import queue
+import threading
+import time
+from flask import current_app
+
+CHANNEL_PREFIX = 'proman:'
+
+# Jeda reconnect listener Redis: mulai 1 detik, berlipat sampai 30 detik
+REDIS_RETRY_MIN = 1
+REDIS_RETRY_MAX = 30
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Queue event untuk satu koneksi stream"""
+
+    def __init__(self, topics, maxsize):
+        self.topics = topics
+        self.queue = queue.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """Pesan berikutnya, atau None bila timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def reset(self):
+        """Buang antrean setelah overflow; klien akan resync"""
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        self.overflowed = False
+
+
+class LocalBackend:
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, topic, message):
+        self.hub.deliver(topic, message)
+
+    def start(self):
+        pass
+
+
+class RedisBackend:
+    """Publish ke Redis; satu thread listener per proses meneruskan ke hub lokal"""
+
+    def __init__(self, hub, url):
+        import redis
+
+        self.hub = hub
+        self.client = redis.Redis.from_url(url)
+        self.listener = None
+        self.lock = threading.Lock()
+
+    def publish(self, topic, message):
+        self.client.publish(CHANNEL_PREFIX + topic, message)
+
+    def start(self):
+        # Dijalankan saat subscriber pertama, setelah fork worker
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, name='events-redis', daemon=True)
+                self.listener.start()
+
+    def listen(self):
+        """Loop listener; koneksi yang putus di-subscribe ulang dengan backoff"""
+        delay = REDIS_RETRY_MIN
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(CHANNEL_PREFIX + '*')
+                delay = REDIS_RETRY_MIN
+                for item in pubsub.listen():
+                    topic = item['channel'].decode()[len(CHANNEL_PREFIX):]
+                    self.hub.deliver(topic, item['data'].decode())
+            except Exception:
+                logger.exception('Redis event listener failed; resubscribing in %ss', delay)
+            finally:
+                pubsub.close()
+            # Event selama terputus hilang; klien diminta resync
+            self.hub.resync_all()
+            time.sleep(delay)
+            delay = min(delay * 2, REDIS_RETRY_MAX)
+
+
+class EventHub:
+    def __init__(self, max_queue):
+        self.max_queue = max_queue
+        self.subscribers = {}
+        self.lock = threading.Lock()
+        self.backend = None
+
+    def subscribe(self, *topics):
+        subscription = Subscription(topics, self.max_queue)
+        with self.lock:
+            for topic in topics:
+                self.subscribers.setdefault(topic, set()).add(subscription)
+        self.backend.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for topic in subscription.topics:
+                subscribers = self.subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.subscribers[topic]
+
+    def resync_all(self):
+        """Minta semua subscriber lokal resync (event mungkin ada yang terlewat)"""
+        with self.lock:
+            subscriptions = {s for subscribers in self.subscribers.values() for s in subscribers}
+        for subscription in subscriptions:
+            subscription.overflowed = True
+
+    def deliver(self, topic, message):
+        """Fan-out ke subscriber lokal; tidak pernah memblok"""
+        with self.lock:
+            subscribers = list(self.subscribers.get(topic, ()))
+        for subscription in subscribers:
+            subscription.put(message)
+
+    def publish(self, topic, message):
+        self.backend.publish(topic, message)
+
+
+def init_events(app):
+    hub = EventHub(app.config.get('EVENTS_QUEUE_SIZE', 100))
+    if app.config.get('EVENTS_BACKEND', 'local') == 'redis':
+        hub.backend = RedisBackend(hub, app.config['EVENTS_REDIS_URL'])
+    else:
+        hub.backend = LocalBackend(hub)
+    app.extensions['events'] = hub
+    return hub
+
+
+def get_hub():
+    return current_app.extensions['events']
+
+
+def format_event(event, data):
+    """Satu pesan SSE; data di-serialize sekali untuk semua subscriber"""
+    return f'event: {event}\ndata: {current_app.json.dumps(data)}\n\n'
+
+
+def publish(event, data, kelas_ids=(), project_ids=()):
+    """Kirim event ke topik kelas/project terkait (panggil setelah commit)"""
+    hub = get_hub()
+    message = format_event(event, data)
+    for kelas_id in set(kelas_ids):
+        hub.publish(f'kelas:{kelas_id}', message)
+    for project_id in set(project_ids):
+        hub.publish(f'project:{project_id}', message)
+
+
+def publish_grouped(event, rows, **extra):
+    """Satu event `{ids: [...]}` per topik untuk operasi massal.
+
+    `rows` berisi (id, project_id, kelas_id) task yang terdampak.
+    """
+    hub = get_hub()
+    topics = {}
+    for row in rows:
+        topics.setdefault(f'kelas:{row.kelas_id}', []).append(row.id)
+        topics.setdefault(f'project:{row.project_id}', []).append(row.id)
+    for topic, ids in topics.items():
+        hub.publish(topic, format_event(event, {'ids': ids, **extra}))
@@ -0,0 +1,113 @@
+"""Ekspansi relasi lewat ?include=tasks,tasks.kelas,... pada endpoint read.
+
+Path include divalidasi terhadap RELATIONS lalu dikompilasi menjadi opsi
+eager loading: relasi koleksi memakai selectinload (satu query per
+level), relasi many-to-one memakai joinedload (ikut JOIN ke query
+induknya). Jumlah query karenanya dibatasi oleh kedalaman include, bukan
+jumlah baris. Response berisi field dasar setiap objek plus relasi yang
+diminta saja.
+"""
+from flask import current_app, request
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+from .models import Task, Project, Kelas, Mahasiswa, User
+from .queries import keyed
+from .utils.params import bool_arg
+from .serializers import task_dict, project_dict, kelas_dict, mahasiswa_profile_dict, _user_dict
+
+# nama include publik -> atribut relationship di model
+RELATIONS = {
+    Project: {'tasks': 'tasks'},
+    Task: {'project': 'project', 'kelas': 'kelas_assigned'},
+    Kelas: {'tasks': 'tasks', 'mahasiswa': 'mahasiswa'},
+    Mahasiswa: {'user': 'user'},
+    User: {},
+}
+
+SERIALIZERS = {
+    Project: project_dict,
+    Task: task_dict,
+    Kelas: kelas_dict,
+    Mahasiswa: mahasiswa_profile_dict,
+    User: _user_dict,
+}
+
+
+def _relationship(model, name):
+    attr = getattr(model, RELATIONS[model][name])
+    return attr, attr.property.mapper.class_
+
+
+def include_arg(model):
+    """Tree include dari query string, mis. {'tasks': {'kelas': {}}}.
+
+    None bila parameter tidak ada; ValueError bila ada path yang tidak
+    dikenal, lebih dalam dari INCLUDE_MAX_DEPTH, atau digabung dengan
+    include_archived.
+    """
+    value = request.args.get('include')
+    if value is None:
+        return None
+    # Tabel arsip tidak punya relationship ORM
+    if bool_arg('include_archived'):
+        raise ValueError('include cannot be combined with include_archived')
+
+    max_depth = current_app.config.get('INCLUDE_MAX_DEPTH', 3)
+    tree = {}
+    for path in filter(None, (part.strip() for part in value.split(','))):
+        names = path.split('.')
+        if len(names) > max_depth:
+            raise ValueError(f'Include path too deep: {path} (max {max_depth} levels)')
+
+        node, current = tree, model
+        for name in names:
+            if name not in RELATIONS[current]:
+                allowed = ', '.join(RELATIONS[current]) or 'none'
+                raise ValueError(f'Unknown include: {path} ({name!r} allowed: {allowed})')
+            current = _relationship(current, name)[1]
+            node = node.setdefault(name, {})
+    return tree
+
+
+def loader_options(model, tree):
+    """Tree include -> opsi selectinload/joinedload"""
+    options = []
+    for name, subtree in tree.items():
+        attr, target = _relationship(model, name)
+        loader = selectinload(attr) if attr.property.uselist else joinedload(attr)
+        if subtree:
+            loader = loader.options(*loader_options(target, subtree))
+        options.append(loader)
+    return options
+
+
+def expand(obj, model, tree):
+    """Serialize objek beserta relasi yang sudah di-eager-load"""
+    data = SERIALIZERS[model](obj)
+    for name, subtree in tree.items():
+        attr, target = _relationship(model, name)
+        value = getattr(obj, attr.key)
+        if attr.property.uselist:
+            data[name] = [expand(item, target, subtree) for item in value]
+        else:
+            data[name] = expand(value, target, subtree) if value is not None else None
+    return data
+
+
+def expanded(model, tree, *criteria):
+    """Query generator (lihat app/queries.py): daftar objek model beserta include"""
+    result = yield (select(model)
+                    .options(*loader_options(model, tree))
+                    .where(*criteria)
+                    .order_by(model.id))
+    return [expand(obj, model, tree) for obj in result.scalars().all()]
+
+
+def expanded_one(model, tree, id):
+    items = yield from expanded(model, tree, model.id == id)
+    return items[0] if items else None
+
+
+def expanded_by_ids(model, tree, ids):
+    items = yield from expanded(model, tree, model.id.in_(ids))
+    return keyed(ids, {item['id']: item for item in items})
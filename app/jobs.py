@@ -0,0 +1,238 @@
+"""Subsistem background job lokal untuk operasi bulk yang lama.
+
+Endpoint memanggil `enqueue()` untuk menyimpan job di tabel `job` lalu
+langsung membalas 202. Job diambil dari tabel oleh loop polling dan
+dijalankan thread pool berukuran JOB_WORKERS, baik di thread daemon
+setiap proses aplikasi (JOBS_RUN_IN_APP) maupun di proses terpisah lewat
+`flask worker`; job queued yang tertinggal saat worker di-recycle atau
+crash diambil lagi oleh poller berikutnya. Klaim job memakai UPDATE
+bersyarat sehingga satu job tidak pernah dijalankan dua kali.
+
+Selama job berjalan, runner yang mengklaimnya memperbarui heartbeat_at
+tiap JOB_HEARTBEAT_SECONDS. Job `running` yang heartbeat-nya lebih tua
+dari JOB_STALE_SECONDS (prosesnya mati di tengah jalan) ditandai failed
+agar client yang polling mendapat hasil; job panjang yang runner-nya
+masih hidup tidak ikut tersapu.
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, select, update
+from .models import db, Job
+
+JOB_HANDLERS = {}
+
+# Jeda minimal antar pengecekan job running yang macet
+STALE_CHECK_INTERVAL = 60
+
+
+def job_handler(name):
+    """Daftarkan fungsi handler(job, payload) untuk tipe job `name`"""
+    def decorator(fn):
+        JOB_HANDLERS[name] = fn
+        return fn
+    return decorator
+
+
+def report_progress(job, progress, total=None):
+    """Simpan progress job (commit) agar bisa dipantau lewat GET /jobs/<id>"""
+    values = {'progress': progress}
+    if total is not None:
+        values['total'] = total
+    db.session.execute(update(Job).where(Job.id == job.id).values(**values))
+    db.session.commit()
+
+
+class JobRunner:
+    """Thread pool berukuran tetap yang menjalankan job dari tabel `job`"""
+
+    def __init__(self, app, workers):
+        self.app = app
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self.slots = threading.BoundedSemaphore(workers)
+        self.wakeup = threading.Event()
+        self.stale_after = app.config.get('JOB_STALE_SECONDS', 300)
+        self.heartbeat_interval = app.config.get('JOB_HEARTBEAT_SECONDS', 30)
+        self.next_stale_check = 0
+        self.pid = None
+        self.runner_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.heartbeat = None
+
+    def notify(self):
+        """Bangunkan loop polling agar job baru tidak menunggu poll_interval"""
+        self.wakeup.set()
+
+    def claim(self, job_id):
+        """Klaim atomik: hanya satu runner yang berhasil mengubah queued -> running"""
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == 'queued')
+            .values(status='running', started_at=datetime.utcnow(),
+                    runner_id=self.runner_id, heartbeat_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        return bool(claimed)
+
+    def beat(self):
+        """Perbarui heartbeat_at semua job running milik runner ini"""
+        db.session.execute(
+            update(Job)
+            .where(Job.status == 'running', Job.runner_id == self.runner_id)
+            .values(heartbeat_at=datetime.utcnow())
+        )
+        db.session.commit()
+
+    def beat_forever(self):
+        """Thread heartbeat; berjalan terpisah dari job agar handler yang lama tetap terhitung hidup"""
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self.app.app_context():
+                try:
+                    self.beat()
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception('Job heartbeat failed')
+
+    def fail_stale(self):
+        """Tandai failed job running yang heartbeat terakhirnya lebih tua dari JOB_STALE_SECONDS"""
+        failed = db.session.execute(
+            update(Job)
+            .where(Job.status == 'running',
+                   func.coalesce(Job.heartbeat_at, Job.started_at)
+                   < datetime.utcnow() - timedelta(seconds=self.stale_after))
+            .values(status='failed', error='Job worker stopped before the job finished',
+                    finished_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        if failed:
+            self.app.logger.warning('Marked %d stale running job(s) as failed', failed)
+        return failed
+
+    def execute(self, job_id):
+        job = db.session.get(Job, job_id)
+        handler = JOB_HANDLERS.get(job.type)
+        try:
+            if handler is None:
+                raise LookupError(f'Unknown job type: {job.type}')
+            result = handler(job, job.payload or {})
+            db.session.commit()
+            # Normalisasi lewat JSON provider aplikasi (date -> ISO, dst.)
+            result = self.app.json.loads(self.app.json.dumps(result))
+            values = {'status': 'completed', 'result': result}
+        except Exception as e:
+            db.session.rollback()
+            self.app.logger.exception('Job %s (%s) failed', job_id, job.type)
+            values = {'status': 'failed', 'error': str(e)}
+
+        values['finished_at'] = datetime.utcnow()
+        # Job yang sudah disapu fail_stale (mis. heartbeat sempat terputus) tidak ditimpa
+        finished = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == 'running', Job.runner_id == self.runner_id)
+            .values(**values)
+        ).rowcount
+        db.session.commit()
+        if not finished:
+            self.app.logger.warning('Job %s was no longer running on this runner; outcome %s discarded',
+                                    job_id, values['status'])
+
+    def _execute_and_release(self, job_id):
+        try:
+            with self.app.app_context():
+                self.execute(job_id)
+        finally:
+            self.slots.release()
+
+    def poll(self):
+        """Satu putaran polling: cek job macet, lalu klaim job queued tertua"""
+        with self.app.app_context():
+            try:
+                if time.monotonic() >= self.next_stale_check:
+                    self.next_stale_check = time.monotonic() + STALE_CHECK_INTERVAL
+                    self.fail_stale()
+                job_id = db.session.execute(
+                    select(Job.id).where(Job.status == 'queued').order_by(Job.id).limit(1)
+                ).scalar()
+                return job_id, job_id is not None and self.claim(job_id)
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def run_forever(self, poll_interval=1.0):
+        """Loop polling: klaim job queued tertua setiap ada slot kosong.
+
+        Error di satu putaran (DB putus, deadlock) di-log lalu dicoba lagi
+        setelah poll_interval, sehingga thread poller tidak mati diam-diam.
+        """
+        if self.heartbeat is None:
+            self.heartbeat = threading.Thread(target=self.beat_forever, name='job-heartbeat', daemon=True)
+            self.heartbeat.start()
+
+        while True:
+            self.slots.acquire()
+            try:
+                job_id, claimed = self.poll()
+                if claimed:
+                    self.executor.submit(self._execute_and_release, job_id)
+                    continue
+            except Exception:
+                self.app.logger.exception('Job poller failed; retrying in %ss', poll_interval)
+                self.slots.release()
+                time.sleep(poll_interval)
+                continue
+
+            self.slots.release()
+            if job_id is None:
+                self.wakeup.wait(poll_interval)
+                self.wakeup.clear()
+
+
+_runner_lock = threading.Lock()
+
+
+def get_runner(app):
+    """Runner in-app beserta thread polling-nya, satu per proses (dibuat setelah fork worker)"""
+    runner = app.extensions.get('job_runner')
+    if runner is None or runner.pid != os.getpid():
+        with _runner_lock:
+            runner = app.extensions.get('job_runner')
+            if runner is None or runner.pid != os.getpid():
+                runner = JobRunner(app, app.config.get('JOB_WORKERS', 2))
+                runner.pid = os.getpid()
+                threading.Thread(
+                    target=runner.run_forever, args=(app.config.get('JOB_POLL_INTERVAL', 1.0),),
+                    name='job-poller', daemon=True
+                ).start()
+                app.extensions['job_runner'] = runner
+    return runner
+
+
+def init_jobs(app):
+    """Mode in-app: nyalakan poller pada request pertama agar job queued yang tertinggal tetap jalan"""
+    if not app.config.get('JOBS_RUN_IN_APP', True):
+        return
+
+    @app.before_request
+    def start_job_runner():
+        get_runner(app)
+
+
+def enqueue(job_type, payload, user_id=None):
+    """Simpan job baru lalu jadwalkan; mengembalikan objek Job"""
+    if job_type not in JOB_HANDLERS:
+        raise LookupError(f'Unknown job type: {job_type}')
+
+    job = Job(type=job_type, payload=payload, status='queued', created_by=user_id)
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    if app.config.get('JOBS_RUN_IN_APP', True):
+        get_runner(app).notify()
+    return job
@@ -1,9 +1,33 @@
+import sqlite3
+from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql
+from sqlalchemy.engine import Engine
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
 
+def sqlite_foreign_keys_on(dbapi_connection, connection_record):
+    # SQLite (dipakai lokal) baru menegakkan FK bila diaktifkan per koneksi
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA foreign_keys=ON')
+    cursor.close()
+
+@event.listens_for(Engine, 'connect')
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # Koneksi aiosqlite bukan sqlite3.Connection; engine async mendaftarkan
+    # sqlite_foreign_keys_on sendiri (lihat AsyncApp.start)
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        sqlite_foreign_keys_on(dbapi_connection, connection_record)
+
+# Presisi mikrodetik di MySQL agar urutan change feed tidak banyak seri
+Timestamp = db.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+
+def updated_at_column():
+    return db.Column(Timestamp, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class Role(db.Model):
     __tablename__ = 'role'
 
@@ -33,6 +57,9 @@ class User(db.Model):
 
 class Mahasiswa(db.Model):
     __tablename__ = 'mahasiswa'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', name='uq_mahasiswa_user_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -41,22 +68,50 @@ class Mahasiswa(db.Model):
 
 class Dosen(db.Model):
     __tablename__ = 'dosen'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', name='uq_dosen_user_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     nip = db.Column(db.String(20), unique=True, nullable=False)
 
 
+class KelasMahasiswa(db.Model):
+    """Enrollment mahasiswa ke kelas"""
+    __tablename__ = 'kelas_mahasiswa'
+    __table_args__ = (
+        # PK (kelas_id, mahasiswa_id) untuk daftar peserta kelas; index ini
+        # untuk arah sebaliknya (kelas milik seorang mahasiswa, /me/tasks)
+        db.Index('ix_kelas_mahasiswa_mahasiswa_id_kelas_id', 'mahasiswa_id', 'kelas_id'),
+    )
+
+    kelas_id = db.Column(db.Integer, db.ForeignKey('kelas.id'), primary_key=True)
+    mahasiswa_id = db.Column(db.Integer, db.ForeignKey('mahasiswa.id'), primary_key=True)
+    enrolled_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
 class Kelas(db.Model):
     __tablename__ = 'kelas'
+    __table_args__ = (
+        # Range scan untuk GET /changes
+        db.Index('ix_kelas_updated_at_id', 'updated_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False, unique=True)
+    updated_at = updated_at_column()
     tasks = db.relationship('Task', back_populates='kelas_assigned', lazy=True)
+    mahasiswa = db.relationship('Mahasiswa', secondary='kelas_mahasiswa', viewonly=True, lazy=True)
 
 
 class Project(db.Model):
     __tablename__ = 'project'
+    __table_args__ = (
+        db.Index('ix_project_updated_at_id', 'updated_at', 'id'),
+        # id tidak boleh dipakai ulang: project yang diarsipkan tetap memegang id-nya
+        {'sqlite_autoincrement': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -64,11 +119,24 @@ class Project(db.Model):
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date, nullable=False)
     status = db.Column(db.String(50), nullable=False)
+    updated_at = updated_at_column()
+    version = db.Column(db.Integer, nullable=False, server_default='1')
 
     tasks = db.relationship('Task', backref='project', lazy=True)
 
+    # UPDATE ... WHERE id = ? AND version = ?; StaleDataError bila versi sudah berubah
+    __mapper_args__ = {'version_id_col': version}
+
 class Task(db.Model):
     __tablename__ = 'task'
+    __table_args__ = (
+        # Dipakai untuk range scan deadline (overdue / upcoming)
+        db.Index('ix_task_due_date_status', 'due_date', 'status'),
+        db.Index('ix_task_updated_at_id', 'updated_at', 'id'),
+        # Join enrollment -> task lalu urut due_date untuk /me/tasks
+        db.Index('ix_task_kelas_id_due_date', 'kelas_id', 'due_date'),
+        {'sqlite_autoincrement': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
@@ -77,5 +145,86 @@ class Task(db.Model):
     description = db.Column(db.Text, nullable=True)
     status = db.Column(db.String(20), default='Belum Mulai')
     due_date = db.Column(db.Date, nullable=False)
+    updated_at = updated_at_column()
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+
+    kelas_assigned = db.relationship('Kelas', back_populates='tasks', lazy=True)
+
+    __mapper_args__ = {'version_id_col': version}
+
+
+class ArchivedProject(db.Model):
+    """Project Completed yang sudah dipindahkan dari tabel `project` (id tetap)"""
+    __tablename__ = 'archived_project'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(50), nullable=False)
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ArchivedTask(db.Model):
+    """Task milik project yang diarsipkan; kelas_id tanpa FK agar kelas tetap bisa dihapus"""
+    __tablename__ = 'archived_task'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('archived_project.id'), nullable=False, index=True)
+    kelas_id = db.Column(db.Integer, nullable=False, index=True)
+    title = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), nullable=True)
+    due_date = db.Column(db.Date, nullable=False)
+    version = db.Column(db.Integer, nullable=False, server_default='1')
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class Tombstone(db.Model):
+    """Jejak penghapusan task/project/kelas untuk GET /changes"""
+    __tablename__ = 'tombstone'
+    __table_args__ = (
+        db.Index('ix_tombstone_deleted_at_id', 'deleted_at', 'id'),
+    )
 
-    kelas_assigned = db.relationship('Kelas', back_populates='tasks', lazy=True)
\ No newline at end of file
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(Timestamp, nullable=False, default=datetime.utcnow)
+
+
+class IdempotencyKey(db.Model):
+    """Response tersimpan untuk header Idempotency-Key (lihat app/utils/idempotency.py)"""
+    __tablename__ = 'idempotency_key'
+
+    # sha256 dari user + method + path + nilai header
+    key = db.Column(db.String(64), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    response_status = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.LargeBinary().with_variant(mysql.MEDIUMBLOB(), 'mysql'), nullable=True)
+    response_headers = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class Job(db.Model):
+    __tablename__ = 'job'
+
+    id = db.Column(db.Integer, primary_key=True)
+    type = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)
+    payload = db.Column(db.JSON, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    # Runner yang mengklaim job dan detak terakhirnya selama job running
+    runner_id = db.Column(db.String(64), nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
@@ -0,0 +1,479 @@
+"""Query read-only yang dipakai bersama oleh route WSGI dan ASGI.
+
+Setiap query ditulis sebagai generator: ia meng-yield statement SQL dan
+menerima Result-nya kembali, lalu me-return data siap di-serialize
+(atau None bila resource tidak ada). Dengan begitu logika query dan
+bentuk response hanya ditulis sekali, dan bisa dijalankan lewat
+`run()` (db.session sinkron) maupun `run_async()` (AsyncSession).
+
+Query di route yang paling sering dipanggil dibangun sekali saat import
+dengan bindparam, lalu di-yield sebagai `(statement, parameter)`. Cache
+key statement tersebut dihitung sekali per proses, sehingga per request
+tidak ada lagi biaya membangun select() maupun menghitung cache key
+untuk lookup di compiled cache SQLAlchemy.
+"""
+import heapq
+from itertools import islice
+from operator import itemgetter
+from sqlalchemy import bindparam, func, select, tuple_
+from .changes import encode_cursor
+from .models import db, Task, Project, Kelas, Mahasiswa, KelasMahasiswa, Tombstone, ArchivedProject, ArchivedTask
+from .serializers import (
+    columns, PROJECT_TASK_FIELDS, ARCHIVED_PROJECT_COLUMNS, ARCHIVED_TASK_COLUMNS,
+    TASK_COLUMNS, PROJECT_COLUMNS, PROJECT_TASK_COLUMNS, KELAS_COLUMNS, KELAS_TASK_COLUMNS,
+    task_dict, task_list_dict, project_dict, project_task_dict, project_detail_task_dict,
+    kelas_dict, kelas_task_dict, kelas_project_task_dict
+)
+
+TASK_STATUSES = ('Belum Mulai', 'In Progress', 'Completed')
+
+
+def run(query):
+    """Jalankan query generator dengan db.session"""
+    try:
+        stmt = next(query)
+        while True:
+            stmt = query.send(db.session.execute(*stmt) if type(stmt) is tuple else db.session.execute(stmt))
+    except StopIteration as stop:
+        return stop.value
+
+
+async def run_async(query, session):
+    """Jalankan query generator dengan AsyncSession"""
+    try:
+        stmt = next(query)
+        while True:
+            stmt = query.send(await (session.execute(*stmt) if type(stmt) is tuple else session.execute(stmt)))
+    except StopIteration as stop:
+        return stop.value
+
+
+# Projects
+#
+# Project dan task-nya selalu berada di tabel yang sama: aktif (project,
+# task) atau arsip (archived_project, archived_task). Dengan
+# include_archived=True, hasil dari arsip ikut dikembalikan dan setiap
+# item diberi field `archived`.
+
+ARCHIVE_SOURCES = (
+    (Project, Task, PROJECT_COLUMNS, TASK_COLUMNS),
+    (ArchivedProject, ArchivedTask, ARCHIVED_PROJECT_COLUMNS, ARCHIVED_TASK_COLUMNS),
+)
+
+
+def _sources(include_archived):
+    return ARCHIVE_SOURCES if include_archived else ARCHIVE_SOURCES[:1]
+
+
+def _per_source(build):
+    """Statement siap pakai untuk setiap sumber, diindeks seperti enumerate(_sources())"""
+    return tuple(build(*source) for source in ARCHIVE_SOURCES)
+
+
+def _mark(items, archived, include_archived):
+    if include_archived:
+        for item in items:
+            item['archived'] = archived
+    return items
+
+
+PROJECT_LIST = _per_source(lambda P, T, project_columns, _: (
+    select(*project_columns),
+    select(T.project_id, *columns(T, PROJECT_TASK_FIELDS)).order_by(T.project_id, T.id),
+))
+
+
+def project_list(include_archived=False):
+    project_list = []
+    for archived, _ in enumerate(_sources(include_archived)):
+        projects_stmt, tasks_stmt = PROJECT_LIST[archived]
+        projects = (yield projects_stmt).all()
+        tasks = (yield tasks_stmt).all()
+
+        tasks_by_project = {}
+        for task in tasks:
+            tasks_by_project.setdefault(task.project_id, []).append(project_task_dict(task))
+
+        items = []
+        for project in projects:
+            project_data = project_dict(project)
+            project_data['tasks'] = tasks_by_project.get(project.id, [])
+            items.append(project_data)
+        project_list += _mark(items, bool(archived), include_archived)
+    return project_list
+
+
+def keyed(ids, results):
+    """Hasil batch fetch: dict per id plus id yang tidak ditemukan"""
+    return {
+        'results': results,
+        'missing': [id for id in ids if id not in results]
+    }
+
+
+def projects_by_ids(ids, include_archived=False):
+    """Banyak project (bentuk sama dengan project_detail) dengan satu IN (...) per tabel"""
+    results = {}
+    for archived, (P, T, project_columns, _) in enumerate(_sources(include_archived)):
+        remaining = [id for id in ids if id not in results]
+        if not remaining:
+            break
+
+        projects = (yield select(*project_columns).where(P.id.in_(remaining))).all()
+        if not projects:
+            continue
+        found = [project.id for project in projects]
+        tasks = (yield select(T.project_id, *columns(T, PROJECT_TASK_FIELDS),
+                              Kelas.id.label('kelas_id'), Kelas.name.label('kelas_name'))
+                 .outerjoin(Kelas, T.kelas_id == Kelas.id)
+                 .where(T.project_id.in_(found))
+                 .order_by(T.project_id, T.id)).all()
+
+        tasks_by_project = {}
+        for task in tasks:
+            tasks_by_project.setdefault(task.project_id, []).append(project_detail_task_dict(task))
+
+        for project in projects:
+            project_data = project_dict(project)
+            project_data['tasks'] = tasks_by_project.get(project.id, [])
+            results[project.id] = _mark([project_data], bool(archived), include_archived)[0]
+    return keyed(ids, results)
+
+
+PROJECT_DETAIL = _per_source(lambda P, T, project_columns, _: (
+    select(*project_columns).where(P.id == bindparam('project_id')),
+    select(*columns(T, PROJECT_TASK_FIELDS), Kelas.id.label('kelas_id'), Kelas.name.label('kelas_name'))
+    .outerjoin(Kelas, T.kelas_id == Kelas.id)
+    .where(T.project_id == bindparam('project_id'))
+    .order_by(T.id),
+))
+
+
+def project_detail(project_id, include_archived=False):
+    params = {'project_id': project_id}
+    for archived, _ in enumerate(_sources(include_archived)):
+        project_stmt, tasks_stmt = PROJECT_DETAIL[archived]
+        project = (yield project_stmt, params).first()
+        if project is not None:
+            break
+    else:
+        return None
+
+    tasks = (yield tasks_stmt, params).all()
+
+    project_data = project_dict(project)
+    project_data['tasks'] = [project_detail_task_dict(task) for task in tasks]
+    return _mark([project_data], bool(archived), include_archived)[0]
+
+
+# Tasks
+
+TASK_LIST = _per_source(lambda P, T, _, task_columns: (
+    select(*task_columns, P.name.label('project_name')).join(P, T.project_id == P.id)
+))
+
+
+def task_list(include_archived=False):
+    result = []
+    for archived, _ in enumerate(_sources(include_archived)):
+        rows = (yield TASK_LIST[archived]).all()
+        result += _mark([task_list_dict(t, 'project_name') for t in rows], bool(archived), include_archived)
+    return result
+
+
+def tasks_by_ids(ids, include_archived=False):
+    """Banyak task (bentuk sama dengan task_list) dengan satu IN (...) per tabel"""
+    results = {}
+    for archived, (P, T, _, task_columns) in enumerate(_sources(include_archived)):
+        remaining = [id for id in ids if id not in results]
+        if not remaining:
+            break
+        rows = (yield select(*task_columns, P.name.label('project_name'))
+                .join(P, T.project_id == P.id)
+                .where(T.id.in_(remaining))).all()
+        for row in rows:
+            results[row.id] = _mark([task_list_dict(row, 'project_name')], bool(archived), include_archived)[0]
+    return keyed(ids, results)
+
+
+PROJECT_TASK_LIST = _per_source(lambda P, T, _, task_columns: (
+    select(P.id).where(P.id == bindparam('project_id')),
+    # Kelas dari task arsip bisa saja sudah dihapus
+    select(*task_columns, Kelas.name.label('kelas_name'))
+    .join(Kelas, T.kelas_id == Kelas.id, isouter=T is not Task)
+    .where(T.project_id == bindparam('project_id')),
+))
+
+
+def project_task_list(project_id, include_archived=False):
+    params = {'project_id': project_id}
+    for archived, _ in enumerate(_sources(include_archived)):
+        exists_stmt, tasks_stmt = PROJECT_TASK_LIST[archived]
+        if (yield exists_stmt, params).first() is not None:
+            break
+    else:
+        return None
+
+    rows = (yield tasks_stmt, params).all()
+    return _mark([task_list_dict(t, 'kelas_name') for t in rows], bool(archived), include_archived)
+
+
+KELAS_EXISTS = select(Kelas.id).where(Kelas.id == bindparam('kelas_id'))
+KELAS_TASK_LIST = _per_source(lambda P, T, _, task_columns: (
+    select(*task_columns, P.name.label('project_name'))
+    .join(P, T.project_id == P.id)
+    .where(T.kelas_id == bindparam('kelas_id'))
+))
+
+
+def kelas_task_list(kelas_id, include_archived=False):
+    params = {'kelas_id': kelas_id}
+    if (yield KELAS_EXISTS, params).first() is None:
+        return None
+
+    result = []
+    for archived, _ in enumerate(_sources(include_archived)):
+        rows = (yield KELAS_TASK_LIST[archived], params).all()
+        result += _mark([task_list_dict(t, 'project_name') for t in rows], bool(archived), include_archived)
+    return result
+
+
+MY_TASKS = (
+    select(*TASK_COLUMNS, Project.name.label('project_name'))
+    .join(KelasMahasiswa, KelasMahasiswa.kelas_id == Task.kelas_id)
+    .join(Mahasiswa, Mahasiswa.id == KelasMahasiswa.mahasiswa_id)
+    .join(Project, Task.project_id == Project.id)
+    .where(Mahasiswa.user_id == bindparam('user_id'))
+    .order_by(Task.due_date, Task.id)
+    .offset(bindparam('offset'))
+    .limit(bindparam('limit'))
+)
+
+
+def my_tasks(user_id, page, per_page):
+    """Task dari kelas tempat user (mahasiswa) terdaftar, dalam satu query join"""
+    rows = (yield MY_TASKS, {'user_id': user_id, 'offset': (page - 1) * per_page, 'limit': per_page + 1}).all()
+
+    return {
+        'tasks': [task_list_dict(t, 'project_name') for t in rows[:per_page]],
+        'page': page,
+        'per_page': per_page,
+        'has_more': len(rows) > per_page
+    }
+
+
+def deadline_filters(conditions, kelas_id=None, project_id=None):
+    """Filter dasar untuk query deadline: belum selesai + scope opsional"""
+    filters = [Task.status != 'Completed', *conditions]
+    if kelas_id is not None:
+        filters.append(Task.kelas_id == kelas_id)
+    if project_id is not None:
+        filters.append(Task.project_id == project_id)
+    return filters
+
+
+def deadline_buckets(filters, page, per_page):
+    """Task per tanggal due_date, satu halaman; hitungan per tanggal dan total dihitung di SQL.
+
+    Hitungan dan baris task berasal dari satu statement sehingga selalu
+    konsisten. `count` sebuah bucket adalah jumlah seluruh task di tanggal
+    itu, walau task-nya terbagi ke dua halaman.
+    """
+    counts = (
+        select(Task.due_date, func.count(Task.id).label('count'))
+        .where(*filters)
+        .group_by(Task.due_date)
+        .subquery()
+    )
+    total = select(func.count(Task.id)).where(*filters).scalar_subquery().correlate(None)
+    rows = (yield select(*TASK_COLUMNS, counts.c.count, total.label('total'))
+            .join(counts, counts.c.due_date == Task.due_date)
+            .where(*filters)
+            .order_by(Task.due_date, Task.id)
+            .offset((page - 1) * per_page)
+            .limit(per_page + 1)).all()
+
+    buckets = {}
+    for t in rows[:per_page]:
+        bucket = buckets.get(t.due_date)
+        if bucket is None:
+            bucket = buckets[t.due_date] = {'date': t.due_date, 'count': t.count, 'tasks': []}
+        bucket['tasks'].append(task_dict(t))
+
+    if rows:
+        total = rows[0].total
+    else:
+        # Halaman di luar jangkauan: total tetap dilaporkan
+        total = (yield select(func.count(Task.id)).where(*filters)).scalar()
+
+    return {
+        'total': total,
+        'buckets': list(buckets.values()),
+        'page': page,
+        'per_page': per_page,
+        'has_more': len(rows) > per_page
+    }
+
+
+def overdue_tasks(today, page, per_page, kelas_id=None, project_id=None):
+    filters = deadline_filters([Task.due_date < today], kelas_id, project_id)
+    result = yield from deadline_buckets(filters, page, per_page)
+    result['today'] = today
+    return result
+
+
+def upcoming_tasks(today, until, page, per_page, kelas_id=None, project_id=None):
+    filters = deadline_filters([Task.due_date >= today, Task.due_date <= until], kelas_id, project_id)
+    result = yield from deadline_buckets(filters, page, per_page)
+    result['from'] = today
+    result['to'] = until
+    return result
+
+
+# Kelas
+
+KELAS_LIST = (
+    select(*KELAS_COLUMNS, func.count(Task.id).label('tasks_count'))
+    .outerjoin(Task, Task.kelas_id == Kelas.id)
+    .group_by(*KELAS_COLUMNS)
+)
+KELAS_BY_ID = select(*KELAS_COLUMNS).where(Kelas.id == bindparam('kelas_id'))
+
+
+def kelas_list():
+    rows = (yield KELAS_LIST).all()
+
+    result = []
+    for row in rows:
+        kelas_data = kelas_dict(row)
+        kelas_data['tasks_count'] = row.tasks_count
+        result.append(kelas_data)
+    return result
+
+
+KELAS_DETAIL_TASKS = select(*KELAS_TASK_COLUMNS).where(Task.kelas_id == bindparam('kelas_id')).order_by(Task.id)
+
+
+def kelas_detail(kelas_id):
+    params = {'kelas_id': kelas_id}
+    kelas = (yield KELAS_BY_ID, params).first()
+    if kelas is None:
+        return None
+
+    rows = (yield KELAS_DETAIL_TASKS, params).all()
+
+    kelas_data = kelas_dict(kelas)
+    kelas_data['tasks'] = [kelas_task_dict(task) for task in rows]
+    return kelas_data
+
+
+KELAS_TASKS = (
+    select(*PROJECT_TASK_COLUMNS, Project.id.label('project_id'), Project.name.label('project_name'))
+    .outerjoin(Project, Task.project_id == Project.id)
+    .where(Task.kelas_id == bindparam('kelas_id'))
+    .order_by(Task.id)
+)
+
+
+def kelas_tasks(kelas_id):
+    params = {'kelas_id': kelas_id}
+    kelas = (yield KELAS_BY_ID, params).first()
+    if kelas is None:
+        return None
+
+    rows = (yield KELAS_TASKS, params).all()
+
+    return {
+        'kelas_id': kelas.id,
+        'kelas_name': kelas.name,
+        'tasks': [kelas_project_task_dict(task) for task in rows]
+    }
+
+
+KELAS_TASK_STATUS = (
+    select(Task.status, func.count(Task.id))
+    .where(Task.kelas_id == bindparam('kelas_id'))
+    .group_by(Task.status)
+)
+
+
+def kelas_task_status(kelas_id):
+    params = {'kelas_id': kelas_id}
+    kelas = (yield KELAS_BY_ID, params).first()
+    if kelas is None:
+        return None
+
+    rows = (yield KELAS_TASK_STATUS, params).all()
+
+    # Menghitung jumlah task berdasarkan status
+    status_count = dict.fromkeys(TASK_STATUSES, 0)
+    total_tasks = 0
+    for status, count in rows:
+        total_tasks += count
+        if status in status_count:
+            status_count[status] = count
+
+    return {
+        'kelas_id': kelas.id,
+        'kelas_name': kelas.name,
+        'task_statistics': status_count,
+        'total_tasks': total_tasks
+    }
+
+
+# Change feed
+
+# Urutan sumber menentukan urutan perubahan dengan timestamp yang sama
+CHANGE_SOURCES = (
+    ('project', Project.updated_at, Project.id, PROJECT_COLUMNS, project_dict),
+    ('kelas', Kelas.updated_at, Kelas.id, KELAS_COLUMNS, kelas_dict),
+    ('task', Task.updated_at, Task.id, TASK_COLUMNS, task_dict),
+    ('delete', Tombstone.deleted_at, Tombstone.id, (Tombstone.id, Tombstone.entity, Tombstone.entity_id), None),
+)
+
+
+def _after(changed_at, id, source, cursor):
+    """Kondisi keyset (changed_at, source, id) > cursor untuk satu sumber"""
+    cursor_at, cursor_source, cursor_id = cursor
+    if source > cursor_source:
+        return changed_at >= cursor_at
+    if source < cursor_source:
+        return changed_at > cursor_at
+    return tuple_(changed_at, id) > tuple_(cursor_at, cursor_id)
+
+
+def changes(cursor, until, limit):
+    """Perubahan setelah cursor hingga `until`, urut (waktu, sumber, id).
+
+    Tiap sumber dibaca dengan range scan index (updated_at, id) dibatasi
+    limit + 1 baris, lalu digabung; `until` sedikit di belakang waktu
+    sekarang agar transaksi yang belum commit tidak terlewati.
+    """
+    batches = []
+    for source, (name, changed_at, id, cols, _) in enumerate(CHANGE_SOURCES):
+        filters = [changed_at <= until]
+        if cursor is not None:
+            filters.append(_after(changed_at, id, source, cursor))
+        rows = (yield select(changed_at.label('changed_at'), *cols)
+                .where(*filters)
+                .order_by(changed_at, id)
+                .limit(limit + 1)).all()
+        batches.append([((row.changed_at, source, row.id), row) for row in rows])
+
+    merged = list(islice(heapq.merge(*batches, key=itemgetter(0)), limit + 1))
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    result = []
+    for (changed_at, source, _), row in merged:
+        name, _, _, _, to_dict = CHANGE_SOURCES[source]
+        if to_dict is None:
+            result.append({'type': row.entity, 'op': 'delete', 'id': row.entity_id, 'changed_at': changed_at})
+        else:
+            result.append({'type': name, 'op': 'upsert', 'id': row.id, 'changed_at': changed_at, 'data': to_dict(row)})
+
+    return {
+        'changes': result,
+        'cursor': encode_cursor(merged[-1][0] if merged else cursor) if merged or cursor else None,
+        'has_more': has_more
+    }
@@ -1,23 +1,36 @@
 from flask import Blueprint, request, jsonify
 from app.models import db, User, Role
 from flask_jwt_extended import create_access_token, jwt_required
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from app.serializers import USER_COLUMNS, user_dict
+from app.utils.integrity import is_unique_violation, is_foreign_key_violation
+from app.utils.params import ids_arg
+from app.utils.idempotency import idempotent
+from app.utils.rate_limit import rate_limited
 
 bp = Blueprint('auth', __name__)
 
 @bp.route('/roles', methods=['POST'])
+@idempotent
 def create_role():
     data = request.get_json()
     role_name = data.get('name')
 
-    if Role.query.filter_by(name=role_name).first():
-        return jsonify({'message': 'Role already exists'}), 400
-
     new_role = Role(name=role_name)
     db.session.add(new_role)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e, 'name'):
+            return jsonify({'message': 'Role already exists'}), 400
+        raise
     return jsonify({'message': 'Role created successfully'}), 201
 
 @bp.route('/register', methods=['POST'])
+@rate_limited('register')
+@idempotent
 def register():
     data = request.get_json()
     name = data.get('name')
@@ -25,20 +38,26 @@ def register():
     password = data.get('password')
     role_id = data.get('role_id')
 
-    role = Role.query.get(role_id)
-    if not role:
+    if role_id is None:
         return jsonify({'message': 'Role does not exist'}), 400
 
-    if User.query.filter_by(email=email).first():
-        return jsonify({'message': 'User already exists'}), 400
-
+    # Role dan email divalidasi oleh constraint FK / unique saat INSERT
     user = User(name=name, email=email, role_id=role_id)
     user.set_password(password)
     db.session.add(user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e, 'email'):
+            return jsonify({'message': 'User already exists'}), 400
+        if is_foreign_key_violation(e):
+            return jsonify({'message': 'Role does not exist'}), 400
+        raise
     return jsonify({'message': 'User registered successfully'}), 201
 
 @bp.route('/login', methods=['POST'])
+@rate_limited('login')
 def login():
     data = request.get_json()
     email = data.get('email')
@@ -54,20 +73,36 @@ def login():
 @bp.route('/users', methods=['GET'])
 @jwt_required()
 def get_users():
-    users = User.query.all()
-    user_list = [{'id': u.id, 'name': u.name, 'email': u.email, 'role': u.role.name} for u in users]
-    return jsonify(user_list)
+    try:
+        ids = ids_arg()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    stmt = select(*USER_COLUMNS).join(Role, User.role_id == Role.id)
+    if ids is None:
+        return jsonify([user_dict(u) for u in db.session.execute(stmt).all()])
+
+    # Batch fetch: satu query IN (...), hasil per id
+    rows = db.session.execute(stmt.where(User.id.in_(ids))).all()
+    results = {u.id: user_dict(u) for u in rows}
+    return jsonify({
+        'results': results,
+        'missing': [id for id in ids if id not in results]
+    })
 
 @bp.route('/users/<int:user_id>', methods=['GET'])
 @jwt_required()
 def get_user(user_id):
-    user = User.query.get(user_id)
+    user = db.session.execute(
+        select(*USER_COLUMNS).join(Role, User.role_id == Role.id).where(User.id == user_id)
+    ).first()
     if not user:
         return jsonify({'message': 'User not found'}), 404
-    return jsonify({'id': user.id, 'name': user.name, 'email': user.email, 'role': user.role.name})
+    return jsonify(user_dict(user))
 
 @bp.route('/users/<int:user_id>', methods=['PUT'])
 @jwt_required()
+@idempotent
 def update_user(user_id):
     data = request.get_json()
     user = User.query.get(user_id)
@@ -77,7 +112,15 @@ def update_user(user_id):
     user.name = data.get('name', user.name) 
     user.email = data.get('email', user.email) 
     user.role_id = data.get('role_id', user.role_id) 
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e, 'email'):
+            return jsonify({'message': 'User already exists'}), 400
+        if is_foreign_key_violation(e):
+            return jsonify({'message': 'Role does not exist'}), 400
+        raise
     return jsonify({'message': 'User updated successfully'}), 200
 
 @bp.route('/users/<int:user_id>', methods=['DELETE'])
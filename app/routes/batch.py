@@ -0,0 +1,159 @@
+"""POST /batch: beberapa request GET dalam satu round trip HTTP.
+
+    {"requests": [{"id": "projects", "path": "/projects/"},
+                  {"id": "status", "path": "/kelas/1/tasks/status"}],
+     "parallel": false}
+
+JWT request batch diverifikasi sekali. Sub-request ke endpoint di
+QUERY_VIEWS dijalankan langsung lewat query generator-nya memakai session
+request batch; dengan `"parallel": true` generator tersebut dijalankan
+bersamaan di thread pool, masing-masing dengan session (dan koneksi)
+sendiri. Endpoint di DISPATCH_ENDPOINTS (mis. /roles/, /auth/users)
+di-dispatch ke view Flask-nya seperti biasa, termasuk decorator role-nya,
+sehingga token diperiksa ulang untuk sub-request tersebut. Endpoint lain,
+terutama stream SSE yang tidak pernah selesai, ditolak dengan 400. Hanya
+GET yang didukung.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import jwt_required
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+from werkzeug.test import EnvironBuilder
+from app.models import db
+from app.queries import run
+from .query_views import QUERY_VIEWS
+
+bp = Blueprint('batch', __name__)
+
+# Endpoint GET di luar QUERY_VIEWS yang boleh di-batch; view-nya mengembalikan JSON biasa
+DISPATCH_ENDPOINTS = frozenset({
+    'auth.get_users', 'auth.get_user',
+    'role.get_roles', 'role.get_role',
+    'mahasiswa.get_all_mahasiswa', 'mahasiswa.get_mahasiswa',
+    'dosen.get_all_dosen', 'dosen.get_dosen',
+    'jobs.get_job',
+})
+
+NOT_BATCHABLE = {'status': 400, 'body': {'message': 'Endpoint cannot be batched'}}
+
+
+def get_executor():
+    executor = current_app.extensions.get('batch_executor')
+    if executor is None:
+        executor = current_app.extensions.setdefault('batch_executor', ThreadPoolExecutor(
+            max_workers=current_app.config.get('BATCH_MAX_WORKERS', 4), thread_name_prefix='batch'
+        ))
+    return executor
+
+
+def sub_environ(path):
+    """Environ GET untuk sub-request, membawa header Authorization request batch"""
+    return EnvironBuilder(
+        path=path,
+        method='GET',
+        base_url=request.url_root,
+        headers={'Authorization': request.headers.get('Authorization', '')},
+        environ_base={'REMOTE_ADDR': request.remote_addr},
+    ).get_environ()
+
+
+def query_entry(data):
+    if data is None:
+        return {'status': 404, 'body': {'message': 'Not Found'}}
+    return {'status': 200, 'body': data}
+
+
+def response_entry(response):
+    if response.is_streamed:
+        # Body streaming (mis. SSE) tidak bisa dibaca sampai habis di dalam batch
+        response.close()
+        return NOT_BATCHABLE
+    body = response.get_json(silent=True) if response.is_json else response.get_data(as_text=True)
+    return {'status': response.status_code, 'body': body}
+
+
+def failed_entry(path):
+    db.session.rollback()
+    current_app.logger.exception('Batch sub-request %s failed', path)
+    return {'status': 500, 'body': {'message': 'Internal Server Error'}}
+
+
+def dispatch(path, parallel, redirects=1):
+    """Entry response satu sub-request, atau query generator bila akan dijalankan paralel"""
+    with current_app.request_context(sub_environ(path)):
+        try:
+            if request.routing_exception is not None:
+                raise request.routing_exception
+            view = QUERY_VIEWS.get(request.endpoint)
+            if view is None:
+                if request.endpoint not in DISPATCH_ENDPOINTS:
+                    return NOT_BATCHABLE
+                return response_entry(current_app.make_response(current_app.dispatch_request()))
+
+            query = view(**request.view_args)
+            if isinstance(query, tuple):
+                return {'status': query[1], 'body': query[0]}
+            return query if parallel else query_entry(run(query))
+        except RequestRedirect as e:
+            # Mis. /tasks -> /tasks/
+            if not redirects:
+                return {'status': e.code, 'body': {'message': e.name}}
+            url = urlsplit(e.new_url)
+            redirected = url.path + (f'?{url.query}' if url.query else '')
+        except HTTPException as e:
+            return {'status': e.code, 'body': {'message': e.name}}
+        except Exception as e:
+            try:
+                rv = current_app.handle_user_exception(e)
+            except Exception:
+                return failed_entry(path)
+            return response_entry(current_app.make_response(rv))
+    return dispatch(redirected, parallel, redirects - 1)
+
+
+def execute(app, query):
+    """Jalankan query generator di thread pool dengan app context (dan session) sendiri"""
+    with app.app_context():
+        return run(query)
+
+
+@bp.route('/', methods=['POST'], strict_slashes=False)
+@jwt_required()
+def batch():
+    data = request.get_json(silent=True)
+    items = data.get('requests') if isinstance(data, dict) else None
+    limit = current_app.config.get('BATCH_MAX_REQUESTS', 20)
+
+    if not isinstance(items, list) or not items:
+        return jsonify({'message': 'requests must be a non-empty list'}), 400
+    if len(items) > limit:
+        return jsonify({'message': f'At most {limit} requests per batch'}), 400
+    if not all(isinstance(item, dict) and isinstance(item.get('path'), str) and item['path'].startswith('/')
+               for item in items):
+        return jsonify({'message': 'Each request needs a path starting with /'}), 400
+    parallel = data.get('parallel') is True
+
+    entries = []
+    for item in items:
+        if str(item.get('method', 'GET')).upper() != 'GET':
+            entries.append({'status': 405, 'body': {'message': 'Only GET requests can be batched'}})
+        else:
+            entries.append(dispatch(item['path'], parallel))
+
+    # Query generator yang tersisa dijalankan bersamaan
+    app = current_app._get_current_object()
+    futures = {
+        index: get_executor().submit(execute, app, entry)
+        for index, entry in enumerate(entries) if not isinstance(entry, dict)
+    }
+    for index, future in futures.items():
+        try:
+            entries[index] = query_entry(future.result())
+        except Exception:
+            entries[index] = failed_entry(items[index]['path'])
+
+    return jsonify({'responses': [
+        {'id': item.get('id', index), **entry} for index, (item, entry) in enumerate(zip(items, entries))
+    ]})
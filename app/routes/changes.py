@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from app import queries
+from app.queries import run
+from app.changes import decode_cursor
+from app.utils.single_flight import coalesced
+
+bp = Blueprint('changes', __name__)
+
+def changes_args():
+    """(cursor, until, limit) dari query string, atau None bila tidak valid"""
+    config = current_app.config
+    since = request.args.get('since')
+    limit = request.args.get('limit', config['CHANGES_PAGE_SIZE'], type=int)
+    if limit < 1:
+        return None
+
+    try:
+        cursor = decode_cursor(since) if since else None
+    except ValueError:
+        return None
+
+    until = datetime.utcnow() - timedelta(seconds=config['CHANGES_SETTLE_SECONDS'])
+    return cursor, until, min(limit, config['CHANGES_MAX_PAGE_SIZE'])
+
+INVALID_CURSOR = {'message': 'Invalid since cursor or limit'}
+
+@bp.route('/', methods=['GET'])
+@jwt_required()
+@coalesced()
+def get_changes():
+    args = changes_args()
+    if args is None:
+        return jsonify(INVALID_CURSOR), 400
+    return jsonify(run(queries.changes(*args)))
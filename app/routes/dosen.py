@@ -1,41 +1,43 @@
 from flask import Blueprint, request, jsonify
 from app.models import db, User, Dosen
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
 from .decorators import role_required
+from app.serializers import DOSEN_COLUMNS, dosen_dict
+from sqlalchemy.exc import IntegrityError
+from app.utils.integrity import is_unique_violation, is_foreign_key_violation
+from app.utils.idempotency import idempotent
 
 bp = Blueprint('dosen', __name__)
 
 @bp.route('/', methods=['GET'])
 @jwt_required()
 def get_all_dosen():
-    dosens = Dosen.query.join(User).all()
-    return jsonify([{
-        'id': d.id,
-        'nip': d.nip,
-        'user': {
-            'id': d.user.id,
-            'name': d.user.name,
-            'email': d.user.email
-        }
-    } for d in dosens])
+    rows = db.session.execute(
+        select(*DOSEN_COLUMNS).join(User, Dosen.user_id == User.id)
+    ).all()
+    return jsonify([dosen_dict(row.dosen, row.user) for row in rows])
 
 @bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
 def get_dosen(id):
     dosen = Dosen.query.get_or_404(id)
-    return jsonify({
-        'id': dosen.id,
-        'nip': dosen.nip,
-        'user': {
-            'id': dosen.user.id,
-            'name': dosen.user.name,
-            'email': dosen.user.email
-        }
-    })
+    return jsonify(dosen_dict(dosen, dosen.user))
+
+def profile_integrity_error(error):
+    """Petakan pelanggaran constraint profil dosen ke response error"""
+    if is_foreign_key_violation(error):
+        return jsonify({'message': 'User not found'}), 404
+    if is_unique_violation(error, 'user_id'):
+        return jsonify({'message': 'User already has a lecturer profile'}), 400
+    if is_unique_violation(error, 'nip'):
+        return jsonify({'message': 'NIP already exists'}), 400
+    raise error
 
 @bp.route('/', methods=['POST'])
 @jwt_required()
 @role_required('Admin')
+@idempotent
 def create_dosen():
     data = request.get_json()
     user_id = data.get('user_id')
@@ -44,59 +46,40 @@ def create_dosen():
     if not all([user_id, nip]):
         return jsonify({'message': 'User ID and NIP are required'}), 400
         
-    # Cek apakah user exists dan belum memiliki profil dosen
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({'message': 'User not found'}), 404
-        
-    if user.dosen_profile:
-        return jsonify({'message': 'User already has a lecturer profile'}), 400
-        
-    # Cek apakah NIP sudah digunakan
-    if Dosen.query.filter_by(nip=nip).first():
-        return jsonify({'message': 'NIP already exists'}), 400
-        
+    # User, profil ganda dan NIP duplikat ditolak oleh constraint database
     dosen = Dosen(user_id=user_id, nip=nip)
     db.session.add(dosen)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        return profile_integrity_error(e)
+    user = db.session.get(User, user_id)
     
     return jsonify({
         'message': 'Lecturer profile created successfully',
-        'dosen': {
-            'id': dosen.id,
-            'nip': dosen.nip,
-            'user': {
-                'id': user.id,
-                'name': user.name,
-                'email': user.email
-            }
-        }
+        'dosen': dosen_dict(dosen, user)
     }), 201
 
 @bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 @role_required('Admin')
+@idempotent
 def update_dosen(id):
     dosen = Dosen.query.get_or_404(id)
     data = request.get_json()
     
     if 'nip' in data:
-        if Dosen.query.filter(Dosen.id != id, Dosen.nip == data['nip']).first():
-            return jsonify({'message': 'NIP already exists'}), 400
         dosen.nip = data['nip']
     
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        return profile_integrity_error(e)
     return jsonify({
         'message': 'Lecturer profile updated successfully',
-        'dosen': {
-            'id': dosen.id,
-            'nip': dosen.nip,
-            'user': {
-                'id': dosen.user.id,
-                'name': dosen.user.name,
-                'email': dosen.user.email
-            }
-        }
+        'dosen': dosen_dict(dosen, dosen.user)
     })
 
 @bp.route('/<int:id>', methods=['DELETE'])
@@ -0,0 +1,28 @@
+from flask import Blueprint, jsonify, url_for
+from app.models import Job
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.serializers import job_dict
+
+bp = Blueprint('jobs', __name__)
+
+def job_accepted(job):
+    """Response 202 standar untuk endpoint yang meng-enqueue job"""
+    response = jsonify({
+        'message': 'Job queued',
+        'job': job_dict(job)
+    })
+    response.status_code = 202
+    response.headers['Location'] = url_for('jobs.get_job', job_id=job.id)
+    return response
+
+@bp.route('/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    job = Job.query.get_or_404(job_id)
+
+    # Hanya pembuat job atau admin yang boleh melihat progress
+    current_user = get_jwt_identity()
+    if current_user.get('role') != 'Admin' and job.created_by != current_user.get('id'):
+        return jsonify({'message': 'Unauthorized access'}), 403
+
+    return jsonify(job_dict(job))
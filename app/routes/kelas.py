@@ -1,47 +1,62 @@
-from flask import Blueprint, request, jsonify
-from app.models import db, Kelas, Task
+from flask import Blueprint, request, jsonify, abort
+from app.models import db, Kelas, Task, Mahasiswa, KelasMahasiswa
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from .decorators import role_required
+from app import queries
+from app.queries import run
+from app.serializers import kelas_dict
+from app.utils.params import bool_arg
+from app.includes import include_arg, expanded, expanded_one
+from .responses import query_response
+from app.changes import record_deletes
+from app.events import publish_grouped
+from sqlalchemy import delete, exists, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from app.utils.integrity import is_unique_violation, is_foreign_key_violation
+from werkzeug.exceptions import HTTPException
+from app.utils.idempotency import idempotent
+from app.utils.single_flight import coalesced
 
 bp = Blueprint('kelas', __name__)
 
 @bp.route('/', methods=['GET'])
 @jwt_required()
+@coalesced()
 def get_all_kelas():
     """Get all kelas"""
-    kelas_list = Kelas.query.all()
-    result = [{
-        'id': kelas.id,
-        'name': kelas.name,
-        'tasks_count': len(kelas.tasks)
-    } for kelas in kelas_list]
-    return jsonify(result)
+    return query_response(all_kelas_query())
+
+def all_kelas_query():
+    """Query GET /kelas/, dengan ?include=... bila diminta"""
+    try:
+        include = include_arg(Kelas)
+    except ValueError as e:
+        return {'message': str(e)}, 400
+    if include is not None:
+        return expanded(Kelas, include)
+    return queries.kelas_list()
+
+def kelas_query(id):
+    """Query GET /kelas/<id>, dengan ?include=... bila diminta"""
+    try:
+        include = include_arg(Kelas)
+    except ValueError as e:
+        return {'message': str(e)}, 400
+    if include is not None:
+        return expanded_one(Kelas, include, id)
+    return queries.kelas_detail(id)
 
 @bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
+@coalesced()
 def get_kelas(id):
     """Get specific kelas by ID"""
-    kelas = Kelas.query.get_or_404(id)
-    
-    # Get tasks for this kelas
-    tasks = [{
-        'id': task.id,
-        'title': task.title,
-        'description': task.description,
-        'status': task.status,
-        'due_date': task.due_date.strftime('%Y-%m-%d'),
-        'project_id': task.project_id
-    } for task in kelas.tasks]
-    
-    return jsonify({
-        'id': kelas.id,
-        'name': kelas.name,
-        'tasks': tasks
-    })
+    return query_response(kelas_query(id))
 
 @bp.route('/', methods=['POST'])
 @jwt_required()
 @role_required('Admin')
+@idempotent
 def create_kelas():
     """Create new kelas"""
     data = request.get_json()
@@ -50,10 +65,7 @@ def create_kelas():
     if not name:
         return jsonify({'message': 'Name is required'}), 400
         
-    # Cek apakah nama kelas sudah ada
-    if Kelas.query.filter_by(name=name).first():
-        return jsonify({'message': 'Class name already exists'}), 400
-        
+    # Nama unik ditegakkan oleh constraint unique saat INSERT
     new_kelas = Kelas(name=name)
     db.session.add(new_kelas)
     
@@ -61,11 +73,13 @@ def create_kelas():
         db.session.commit()
         return jsonify({
             'message': 'Class created successfully',
-            'kelas': {
-                'id': new_kelas.id,
-                'name': new_kelas.name
-            }
+            'kelas': kelas_dict(new_kelas)
         }), 201
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e, 'name'):
+            return jsonify({'message': 'Class name already exists'}), 400
+        return jsonify({'message': 'Error creating class', 'error': str(e)}), 500
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Error creating class', 'error': str(e)}), 500
@@ -73,31 +87,38 @@ def create_kelas():
 @bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 @role_required('Admin')
+@idempotent
 def update_kelas(id):
     """Update existing kelas"""
-    kelas = Kelas.query.get_or_404(id)
     data = request.get_json()
     
-    if 'name' in data:
-        # Cek apakah nama baru sudah ada di kelas lain
-        existing_kelas = Kelas.query.filter(
-            Kelas.name == data['name'], 
-            Kelas.id != id
-        ).first()
-        if existing_kelas:
-            return jsonify({'message': 'Class name already exists'}), 400
-            
-        kelas.name = data['name']
+    if 'name' not in data:
+        kelas = Kelas.query.get_or_404(id)
+        return jsonify({
+            'message': 'Class updated successfully',
+            'kelas': kelas_dict(kelas)
+        })
         
     try:
+        # UPDATE langsung; nama duplikat ditolak oleh constraint unique
+        updated = db.session.execute(
+            update(Kelas).where(Kelas.id == id).values(name=data['name'])
+        ).rowcount
+        if not updated:
+            db.session.rollback()
+            abort(404)
         db.session.commit()
         return jsonify({
             'message': 'Class updated successfully',
-            'kelas': {
-                'id': kelas.id,
-                'name': kelas.name
-            }
+            'kelas': {'id': id, 'name': data['name']}
         })
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e, 'name'):
+            return jsonify({'message': 'Class name already exists'}), 400
+        return jsonify({'message': 'Error updating class', 'error': str(e)}), 500
+    except HTTPException:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Error updating class', 'error': str(e)}), 500
@@ -107,66 +128,130 @@ def update_kelas(id):
 @role_required('Admin')  # Hanya admin yang bisa menghapus kelas
 def delete_kelas(id):
     """Delete a kelas"""
-    kelas = Kelas.query.get_or_404(id)
-    
-    # Cek apakah kelas masih memiliki tasks
-    if kelas.tasks:
+    cascade = bool_arg('cascade')
+
+    # Cek apakah kelas masih memiliki tasks (EXISTS, tanpa me-load task)
+    if not cascade and db.session.query(exists().where(Task.kelas_id == id)).scalar():
         return jsonify({
             'message': 'Cannot delete class with existing tasks. Please delete the tasks first'
         }), 400
     
     try:
-        db.session.delete(kelas)
+        deleted_tasks = 0
+        tasks = []
+        if cascade:
+            tasks = db.session.execute(
+                select(Task.id, Task.project_id, Task.kelas_id).where(Task.kelas_id == id)
+            ).all()
+            record_deletes(Task, Task.kelas_id == id)
+            deleted_tasks = db.session.execute(delete(Task).where(Task.kelas_id == id)).rowcount
+
+        # Enrollment ikut terhapus bersama kelasnya
+        db.session.execute(delete(KelasMahasiswa).where(KelasMahasiswa.kelas_id == id))
+        record_deletes(Kelas, Kelas.id == id)
+        if not db.session.execute(delete(Kelas).where(Kelas.id == id)).rowcount:
+            db.session.rollback()
+            abort(404)
         db.session.commit()
-        return jsonify({'message': 'Class deleted successfully'})
+        publish_grouped('tasks.deleted', tasks)
+
+        result = {'message': 'Class deleted successfully'}
+        if cascade:
+            result['deleted_tasks'] = deleted_tasks
+        return jsonify(result)
+    except HTTPException:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Error deleting class', 'error': str(e)}), 500
 
 @bp.route('/<int:id>/tasks', methods=['GET'])
 @jwt_required()
+@coalesced()
 def get_kelas_tasks(id):
     """Get all tasks for a specific kelas"""
-    kelas = Kelas.query.get_or_404(id)
-    
-    tasks = [{
-        'id': task.id,
-        'title': task.title,
-        'description': task.description,
-        'status': task.status,
-        'due_date': task.due_date.strftime('%Y-%m-%d'),
-        'project': {
-            'id': task.project.id,
-            'name': task.project.name
-        } if task.project else None
-    } for task in kelas.tasks]
-    
-    return jsonify({
-        'kelas_id': kelas.id,
-        'kelas_name': kelas.name,
-        'tasks': tasks
-    })
+    result = run(queries.kelas_tasks(id))
+    if result is None:
+        abort(404)
+    return jsonify(result)
 
 @bp.route('/<int:id>/tasks/status', methods=['GET'])
 @jwt_required()
+@coalesced()
 def get_kelas_tasks_status(id):
     """Get task statistics for a kelas"""
-    kelas = Kelas.query.get_or_404(id)
-    
-    # Menghitung jumlah task berdasarkan status
-    status_count = {
-        'Belum Mulai': 0,
-        'In Progress': 0,
-        'Completed': 0
-    }
-    
-    for task in kelas.tasks:
-        if task.status in status_count:
-            status_count[task.status] += 1
-    
+    result = run(queries.kelas_task_status(id))
+    if result is None:
+        abort(404)
+    return jsonify(result)
+
+ENROLL_MAX_IDS = 1000
+INVALID_ENROLLMENT = {'message': f'mahasiswa_ids must be a non-empty list of at most {ENROLL_MAX_IDS} integers'}
+
+def enrollment_ids():
+    """mahasiswa_ids dari body, atau None bila tidak valid"""
+    ids = (request.get_json(silent=True) or {}).get('mahasiswa_ids')
+    if not isinstance(ids, list) or not ids or len(ids) > ENROLL_MAX_IDS:
+        return None
+    if not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return None
+    return list(set(ids))
+
+@bp.route('/<int:id>/enroll', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+@idempotent
+def enroll_mahasiswa(id):
+    """Enroll banyak mahasiswa sekaligus; yang sudah terdaftar / tidak ada dilewati"""
+    mahasiswa_ids = enrollment_ids()
+    if mahasiswa_ids is None:
+        return jsonify(INVALID_ENROLLMENT), 400
+
+    # Satu INSERT ... SELECT: hanya mahasiswa yang ada dan belum terdaftar
+    already_enrolled = exists().where(
+        KelasMahasiswa.kelas_id == id,
+        KelasMahasiswa.mahasiswa_id == Mahasiswa.id
+    )
+    try:
+        enrolled = db.session.execute(insert(KelasMahasiswa).from_select(
+            ['kelas_id', 'mahasiswa_id'],
+            select(literal(id), Mahasiswa.id).where(Mahasiswa.id.in_(mahasiswa_ids), ~already_enrolled)
+        )).rowcount
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_foreign_key_violation(e):
+            abort(404)
+        raise
+
+    if not enrolled and db.session.get(Kelas, id) is None:
+        abort(404)
+
     return jsonify({
-        'kelas_id': kelas.id,
-        'kelas_name': kelas.name,
-        'task_statistics': status_count,
-        'total_tasks': len(kelas.tasks)
-    })
\ No newline at end of file
+        'message': 'Students enrolled successfully',
+        'enrolled': enrolled,
+        'skipped': len(mahasiswa_ids) - enrolled
+    })
+
+@bp.route('/<int:id>/enroll', methods=['DELETE'])
+@jwt_required()
+@role_required('Admin')
+def unenroll_mahasiswa(id):
+    """Keluarkan banyak mahasiswa dari kelas sekaligus"""
+    mahasiswa_ids = enrollment_ids()
+    if mahasiswa_ids is None:
+        return jsonify(INVALID_ENROLLMENT), 400
+
+    removed = db.session.execute(delete(KelasMahasiswa).where(
+        KelasMahasiswa.kelas_id == id,
+        KelasMahasiswa.mahasiswa_id.in_(mahasiswa_ids)
+    )).rowcount
+    db.session.commit()
+
+    if not removed and db.session.get(Kelas, id) is None:
+        abort(404)
+
+    return jsonify({
+        'message': 'Students unenrolled successfully',
+        'unenrolled': removed
+    })
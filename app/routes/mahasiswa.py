@@ -1,41 +1,45 @@
 from flask import Blueprint, request, jsonify
-from app.models import db, User, Mahasiswa
+from app.models import db, User, Mahasiswa, KelasMahasiswa
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import delete, select
 from .decorators import role_required
+from app.serializers import MAHASISWA_COLUMNS, mahasiswa_dict
+from sqlalchemy.exc import IntegrityError
+from app.utils.integrity import is_unique_violation, is_foreign_key_violation
+from app.jobs import enqueue, job_handler, report_progress
+from .jobs import job_accepted
+from app.utils.idempotency import idempotent
 
 bp = Blueprint('mahasiswa', __name__)
 
 @bp.route('/', methods=['GET'])
 @jwt_required()
 def get_all_mahasiswa():
-    mahasiswas = Mahasiswa.query.join(User).all()
-    return jsonify([{
-        'id': m.id,
-        'nim': m.nim,
-        'user': {
-            'id': m.user.id,
-            'name': m.user.name,
-            'email': m.user.email
-        }
-    } for m in mahasiswas])
+    rows = db.session.execute(
+        select(*MAHASISWA_COLUMNS).join(User, Mahasiswa.user_id == User.id)
+    ).all()
+    return jsonify([mahasiswa_dict(row.mahasiswa, row.user) for row in rows])
 
 @bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
 def get_mahasiswa(id):
     mahasiswa = Mahasiswa.query.get_or_404(id)
-    return jsonify({
-        'id': mahasiswa.id,
-        'nim': mahasiswa.nim,
-        'user': {
-            'id': mahasiswa.user.id,
-            'name': mahasiswa.user.name,
-            'email': mahasiswa.user.email
-        }
-    })
+    return jsonify(mahasiswa_dict(mahasiswa, mahasiswa.user))
+
+def profile_integrity_error(error):
+    """Petakan pelanggaran constraint profil mahasiswa ke response error"""
+    if is_foreign_key_violation(error):
+        return jsonify({'message': 'User not found'}), 404
+    if is_unique_violation(error, 'user_id'):
+        return jsonify({'message': 'User already has a student profile'}), 400
+    if is_unique_violation(error, 'nim'):
+        return jsonify({'message': 'NIM already exists'}), 400
+    raise error
 
 @bp.route('/', methods=['POST'])
 @jwt_required()
 @role_required('Admin')
+@idempotent
 def create_mahasiswa():
     data = request.get_json()
     user_id = data.get('user_id')
@@ -44,59 +48,40 @@ def create_mahasiswa():
     if not all([user_id, nim]):
         return jsonify({'message': 'User ID and NIM are required'}), 400
         
-    # Cek apakah user exists dan belum memiliki profil mahasiswa
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({'message': 'User not found'}), 404
-        
-    if user.mahasiswa_profile:
-        return jsonify({'message': 'User already has a student profile'}), 400
-        
-    # Cek apakah NIM sudah digunakan
-    if Mahasiswa.query.filter_by(nim=nim).first():
-        return jsonify({'message': 'NIM already exists'}), 400
-        
+    # User, profil ganda dan NIM duplikat ditolak oleh constraint database
     mahasiswa = Mahasiswa(user_id=user_id, nim=nim)
     db.session.add(mahasiswa)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        return profile_integrity_error(e)
+    user = db.session.get(User, user_id)
     
     return jsonify({
         'message': 'Student profile created successfully',
-        'mahasiswa': {
-            'id': mahasiswa.id,
-            'nim': mahasiswa.nim,
-            'user': {
-                'id': user.id,
-                'name': user.name,
-                'email': user.email
-            }
-        }
+        'mahasiswa': mahasiswa_dict(mahasiswa, user)
     }), 201
 
 @bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 @role_required('Admin')
+@idempotent
 def update_mahasiswa(id):
     mahasiswa = Mahasiswa.query.get_or_404(id)
     data = request.get_json()
     
     if 'nim' in data:
-        if Mahasiswa.query.filter(Mahasiswa.id != id, Mahasiswa.nim == data['nim']).first():
-            return jsonify({'message': 'NIM already exists'}), 400
         mahasiswa.nim = data['nim']
     
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        return profile_integrity_error(e)
     return jsonify({
         'message': 'Student profile updated successfully',
-        'mahasiswa': {
-            'id': mahasiswa.id,
-            'nim': mahasiswa.nim,
-            'user': {
-                'id': mahasiswa.user.id,
-                'name': mahasiswa.user.name,
-                'email': mahasiswa.user.email
-            }
-        }
+        'mahasiswa': mahasiswa_dict(mahasiswa, mahasiswa.user)
     })
 
 @bp.route('/<int:id>', methods=['DELETE'])
@@ -104,6 +89,55 @@ def update_mahasiswa(id):
 @role_required('Admin')
 def delete_mahasiswa(id):
     mahasiswa = Mahasiswa.query.get_or_404(id)
+    db.session.execute(delete(KelasMahasiswa).where(KelasMahasiswa.mahasiswa_id == id))
     db.session.delete(mahasiswa)
     db.session.commit()
-    return jsonify({'message': 'Student profile deleted successfully'})
\ No newline at end of file
+    return jsonify({'message': 'Student profile deleted successfully'})
+
+IMPORT_BATCH_SIZE = 200
+
+@job_handler('mahasiswa.import')
+def import_mahasiswa_job(job, payload):
+    """Insert profil mahasiswa per batch; batch yang gagal diulang per baris"""
+    items = payload['items']
+    report_progress(job, 0, len(items))
+
+    created = 0
+    errors = []
+    for start in range(0, len(items), IMPORT_BATCH_SIZE):
+        batch = items[start:start + IMPORT_BATCH_SIZE]
+        rows = [{'user_id': item['user_id'], 'nim': item['nim']} for item in batch]
+        try:
+            db.session.execute(Mahasiswa.__table__.insert(), rows)
+            db.session.commit()
+            created += len(rows)
+        except IntegrityError:
+            db.session.rollback()
+            for index, row in enumerate(rows, start):
+                try:
+                    db.session.execute(Mahasiswa.__table__.insert(), row)
+                    db.session.commit()
+                    created += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    errors.append({'index': index, 'nim': row['nim'], 'message': 'Invalid user or duplicate NIM'})
+        report_progress(job, start + len(batch))
+
+    return {'created': created, 'errors': errors}
+
+@bp.route('/import', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+@idempotent
+def import_mahasiswa():
+    data = request.get_json()
+    items = data.get('items')
+
+    if not isinstance(items, list) or not items:
+        return jsonify({'message': 'items must be a non-empty list'}), 400
+
+    if not all(isinstance(item, dict) and item.get('user_id') and item.get('nim') for item in items):
+        return jsonify({'message': 'User ID and NIM are required for every item'}), 400
+
+    job = enqueue('mahasiswa.import', {'items': items}, get_jwt_identity().get('id'))
+    return job_accepted(job)
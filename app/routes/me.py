@@ -0,0 +1,18 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import queries
+from app.queries import run
+from app.utils.params import page_args, INVALID_PAGE
+from app.utils.single_flight import coalesced
+
+bp = Blueprint('me', __name__)
+
+@bp.route('/tasks', methods=['GET'])
+@jwt_required()
+@coalesced(per_user=True)
+def get_my_tasks():
+    """Task dari kelas yang diikuti user yang sedang login"""
+    args = page_args('ME_TASKS')
+    if args is None:
+        return jsonify(INVALID_PAGE), 400
+    return jsonify(run(queries.my_tasks(get_jwt_identity().get('id'), *args)))
@@ -1,8 +1,26 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, abort, current_app
 from app.models import db, Project, Task
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from .decorators import role_required
+from app import queries
+from app.queries import run
+from app.serializers import project_dict
+from app.utils.params import bool_arg, ids_arg, version_arg
+from app.includes import include_arg, expanded, expanded_one, expanded_by_ids
+from .responses import query_response, version_conflict, etag
+from sqlalchemy import delete, exists, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from app.utils.integrity import is_foreign_key_violation
+from app.changes import record_deletes
+from app.events import publish_grouped
+from app.archive import archive_projects
+from app.clone import clone_project
+from app.jobs import enqueue, job_handler, report_progress
+from .jobs import job_accepted
+from app.utils.idempotency import idempotent
+from app.utils.single_flight import coalesced
 
 bp = Blueprint('projects', __name__)
 
@@ -12,62 +30,47 @@ def parse_date(date_str):
     except ValueError:
         return None
 
+def all_projects_query():
+    """Query GET /projects/: batch ?ids=... atau semua project; tuple response bila tidak valid"""
+    try:
+        ids = ids_arg()
+        include = include_arg(Project)
+    except ValueError as e:
+        return {'message': str(e)}, 400
+    if include is not None:
+        if ids is not None:
+            return expanded_by_ids(Project, include, ids)
+        return expanded(Project, include)
+    if ids is not None:
+        return queries.projects_by_ids(ids, bool_arg('include_archived'))
+    return queries.project_list(bool_arg('include_archived'))
+
 @bp.route('/', methods=['GET'])
 @jwt_required()
+@coalesced()
 def get_projects():
-    projects = Project.query.all()
-    project_list = []
-    
-    for project in projects:
-        project_data = {
-            'id': project.id,
-            'name': project.name,
-            'description': project.description,
-            'start_date': project.start_date.strftime('%Y-%m-%d'),
-            'end_date': project.end_date.strftime('%Y-%m-%d'),
-            'status': project.status,
-            'tasks': [{
-                'id': task.id,
-                'title': task.title,
-                'description': task.description,
-                'status': task.status,
-                'due_date': task.due_date.strftime('%Y-%m-%d'),
-            } for task in project.tasks]
-        }
-        project_list.append(project_data)
-    
-    return jsonify(project_list)
+    return query_response(all_projects_query())
+
+def project_query(project_id):
+    """Query GET /projects/<id>, dengan ?include=... bila diminta"""
+    try:
+        include = include_arg(Project)
+    except ValueError as e:
+        return {'message': str(e)}, 400
+    if include is not None:
+        return expanded_one(Project, include, project_id)
+    return queries.project_detail(project_id, bool_arg('include_archived'))
 
 @bp.route('/<int:project_id>', methods=['GET'])
 @jwt_required()
+@coalesced()
 def get_project(project_id):
-    project = Project.query.get_or_404(project_id)
-    
-    project_data = {
-        'id': project.id,
-        'name': project.name,
-        'description': project.description,
-        'start_date': project.start_date.strftime('%Y-%m-%d'),
-        'end_date': project.end_date.strftime('%Y-%m-%d'),
-        'status': project.status,
-        'tasks': [{
-            'id': task.id,
-            'title': task.title,
-            'description': task.description,
-            'status': task.status,
-            'due_date': task.due_date.strftime('%Y-%m-%d'),
-            'kelas': {
-                'id': task.kelas.id,
-                'name': task.kelas.name
-            } if task.kelas else None
-        } for task in project.tasks]
-    }
-    
-    return jsonify(project_data)
+    return query_response(project_query(project_id))
 
 @bp.route('/', methods=['POST'])
 @jwt_required()
 @role_required('Admin')  # Hanya admin yang bisa membuat project
+@idempotent
 def create_project():
     data = request.get_json()
     
@@ -102,22 +105,22 @@ def create_project():
     
     return jsonify({
         'message': 'Project created successfully',
-        'project': {
-            'id': new_project.id,
-            'name': new_project.name,
-            'description': new_project.description,
-            'start_date': new_project.start_date.strftime('%Y-%m-%d'),
-            'end_date': new_project.end_date.strftime('%Y-%m-%d'),
-            'status': new_project.status
-        }
+        'project': project_dict(new_project)
     }), 201
 
 @bp.route('/<int:project_id>', methods=['PUT'])
 @jwt_required()
 @role_required('Admin')
+@idempotent
 def update_project(project_id):
     project = Project.query.get_or_404(project_id)
     data = request.get_json()
+    try:
+        expected_version = version_arg(data)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    if expected_version is not None and expected_version != project.version:
+        return version_conflict(project.version)
     
     if 'name' in data:
         project.name = data['name']
@@ -146,33 +149,136 @@ def update_project(project_id):
             return jsonify({'message': f'Invalid status. Must be one of: {", ".join(valid_statuses)}'}), 400
         project.status = data['status']
     
-    db.session.commit()
+    try:
+        db.session.commit()
+    except StaleDataError:
+        # Project diubah request lain di antara SELECT dan UPDATE
+        db.session.rollback()
+        return version_conflict()
     
     return jsonify({
         'message': 'Project updated successfully',
-        'project': {
-            'id': project.id,
-            'name': project.name,
-            'description': project.description,
-            'start_date': project.start_date.strftime('%Y-%m-%d'),
-            'end_date': project.end_date.strftime('%Y-%m-%d'),
-            'status': project.status
-        }
-    })
+        'project': project_dict(project)
+    }), 200, etag(project.version)
 
 @bp.route('/<int:project_id>', methods=['DELETE'])
 @jwt_required()
 @role_required('Admin')
 def delete_project(project_id):
-    project = Project.query.get_or_404(project_id)
-    
-    # Cek apakah project memiliki tasks
-    if project.tasks:
+    cascade = bool_arg('cascade')
+
+    # Cek apakah project memiliki tasks (EXISTS, tanpa me-load task)
+    if not cascade and db.session.query(exists().where(Task.project_id == project_id)).scalar():
         return jsonify({
             'message': 'Cannot delete project with existing tasks. Delete tasks first.'
         }), 400
-    
-    db.session.delete(project)
+
+    deleted_tasks = 0
+    tasks = []
+    if cascade:
+        tasks = db.session.execute(
+            select(Task.id, Task.project_id, Task.kelas_id).where(Task.project_id == project_id)
+        ).all()
+        record_deletes(Task, Task.project_id == project_id)
+        deleted_tasks = db.session.execute(delete(Task).where(Task.project_id == project_id)).rowcount
+
+    record_deletes(Project, Project.id == project_id)
+    if not db.session.execute(delete(Project).where(Project.id == project_id)).rowcount:
+        db.session.rollback()
+        abort(404)
     db.session.commit()
-    
-    return jsonify({'message': 'Project deleted successfully'})
\ No newline at end of file
+    publish_grouped('tasks.deleted', tasks)
+
+    result = {'message': 'Project deleted successfully'}
+    if cascade:
+        result['deleted_tasks'] = deleted_tasks
+    return jsonify(result)
+
+@bp.route('/<int:project_id>/clone', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+@idempotent
+def clone(project_id):
+    source = Project.query.get_or_404(project_id)
+    data = request.get_json(silent=True) or {}
+
+    # Geser tanggal dengan shift_days, atau hitung dari start_date baru
+    days = data.get('shift_days', 0)
+    if 'start_date' in data:
+        if 'shift_days' in data:
+            return jsonify({'message': 'Use either shift_days or start_date, not both'}), 400
+        start_date = parse_date(data['start_date']) if isinstance(data['start_date'], str) else None
+        if not start_date:
+            return jsonify({'message': 'Invalid start date format. Use YYYY-MM-DD'}), 400
+        days = (start_date - source.start_date).days
+    if not isinstance(days, int) or isinstance(days, bool):
+        return jsonify({'message': 'shift_days must be an integer'}), 400
+
+    kelas_map = data.get('kelas_map') or {}
+    try:
+        kelas_map = {int(old): int(new) for old, new in dict(kelas_map).items()}
+    except (TypeError, ValueError):
+        return jsonify({'message': 'kelas_map must map kelas ids to kelas ids'}), 400
+
+    status = data.get('status', 'Not Started')
+    valid_statuses = ['Not Started', 'In Progress', 'Completed', 'On Hold']
+    if status not in valid_statuses:
+        return jsonify({'message': f'Invalid status. Must be one of: {", ".join(valid_statuses)}'}), 400
+
+    try:
+        project, task_count = clone_project(source, days, kelas_map, data.get('name'), status)
+        db.session.commit()
+    except OverflowError:
+        db.session.rollback()
+        return jsonify({'message': 'shift_days is out of range'}), 400
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_foreign_key_violation(e):
+            return jsonify({'message': 'Kelas not found'}), 404
+        raise
+
+    tasks = db.session.execute(
+        select(Task.id, Task.project_id, Task.kelas_id).where(Task.project_id == project.id)
+    ).all()
+    publish_grouped('tasks.created', tasks)
+    return jsonify({
+        'message': 'Project cloned successfully',
+        'project': project_dict(project),
+        'tasks': task_count
+    }), 201
+
+@job_handler('projects.export')
+def export_projects_job(job, payload):
+    """Export semua project beserta task-nya sebagai hasil job"""
+    return run(queries.project_list())
+
+@bp.route('/export', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+@idempotent
+def export_projects():
+    job = enqueue('projects.export', {}, get_jwt_identity().get('id'))
+    return job_accepted(job)
+
+@job_handler('projects.archive')
+def archive_projects_job(job, payload):
+    """Pindahkan project Completed lama ke tabel arsip"""
+    return archive_projects(
+        payload['days'],
+        current_app.config['ARCHIVE_BATCH_SIZE'],
+        progress=lambda archived: report_progress(job, archived)
+    )
+
+@bp.route('/archive', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+@idempotent
+def archive_completed_projects():
+    data = request.get_json(silent=True) or {}
+    days = data.get('days', current_app.config['ARCHIVE_AFTER_DAYS'])
+
+    if not isinstance(days, int) or days < 0:
+        return jsonify({'message': 'days must be a non-negative integer'}), 400
+
+    job = enqueue('projects.archive', {'days': days}, get_jwt_identity().get('id'))
+    return job_accepted(job)
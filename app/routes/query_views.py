@@ -0,0 +1,65 @@
+"""Registry route GET yang bisa dijalankan tanpa view Flask-nya.
+
+Dipakai mode ASGI (app/asgi.py) dan POST /batch: keduanya memverifikasi
+JWT sendiri, memanggil fungsi di sini untuk mendapat query generator,
+lalu menjalankannya dengan session masing-masing. Endpoint di sini hanya
+butuh jwt_required (tanpa role_required).
+"""
+from datetime import date
+from flask_jwt_extended import get_jwt_identity
+from app import queries
+from app.utils.params import bool_arg, page_args, INVALID_PAGE
+from .tasks import all_tasks_query, deadline_scope, upcoming_range, INVALID_DAYS
+from .projects import all_projects_query, project_query
+from .kelas import all_kelas_query, kelas_query
+from .changes import changes_args, INVALID_CURSOR
+
+
+def _overdue_tasks():
+    page = page_args('DEADLINE_TASKS')
+    if page is None:
+        return INVALID_PAGE, 400
+    return queries.overdue_tasks(date.today(), *page, **deadline_scope())
+
+
+def _upcoming_tasks():
+    date_range = upcoming_range()
+    if date_range is None:
+        return INVALID_DAYS, 400
+    page = page_args('DEADLINE_TASKS')
+    if page is None:
+        return INVALID_PAGE, 400
+    return queries.upcoming_tasks(*date_range, *page, **deadline_scope())
+
+
+def _changes():
+    args = changes_args()
+    if args is None:
+        return INVALID_CURSOR, 400
+    return queries.changes(*args)
+
+
+def _my_tasks():
+    args = page_args('ME_TASKS')
+    if args is None:
+        return INVALID_PAGE, 400
+    return queries.my_tasks(get_jwt_identity().get('id'), *args)
+
+
+# endpoint Flask -> fungsi(view_args) yang mengembalikan query generator
+# (atau tuple response untuk error validasi)
+QUERY_VIEWS = {
+    'projects.get_projects': all_projects_query,
+    'projects.get_project': project_query,
+    'tasks.get_all_tasks': all_tasks_query,
+    'tasks.get_project_tasks': lambda project_id: queries.project_task_list(project_id, bool_arg('include_archived')),
+    'tasks.get_kelas_tasks': lambda kelas_id: queries.kelas_task_list(kelas_id, bool_arg('include_archived')),
+    'tasks.get_overdue_tasks': _overdue_tasks,
+    'tasks.get_upcoming_tasks': _upcoming_tasks,
+    'kelas.get_all_kelas': all_kelas_query,
+    'kelas.get_kelas': kelas_query,
+    'kelas.get_kelas_tasks': lambda id: queries.kelas_tasks(id),
+    'kelas.get_kelas_tasks_status': lambda id: queries.kelas_task_status(id),
+    'changes.get_changes': _changes,
+    'me.get_my_tasks': _my_tasks,
+}
@@ -0,0 +1,21 @@
+from flask import jsonify, abort
+from app.queries import run
+
+def query_response(query):
+    """Jalankan query generator dari helper *_query(); tuple = response error validasi"""
+    if isinstance(query, tuple):
+        return jsonify(query[0]), query[1]
+    data = run(query)
+    if data is None:
+        abort(404)
+    return jsonify(data)
+
+def version_conflict(current=None):
+    """409 untuk update dengan versi usang (If-Match / version tidak cocok)"""
+    body = {'message': 'Resource was modified by another request, reload and retry'}
+    if current is not None:
+        body['version'] = current
+    return jsonify(body), 409
+
+def etag(version):
+    return {'ETag': f'"{version}"'}
@@ -1,31 +1,32 @@
-from flask import Blueprint, request, jsonify
-from app.models import db, Role
+from flask import Blueprint, request, jsonify, abort
+from app.models import db, Role, User, Mahasiswa, Dosen, Job, KelasMahasiswa
 from flask_jwt_extended import jwt_required
+from sqlalchemy import delete, exists, select, update
 from .decorators import role_required
+from app.serializers import ROLE_COLUMNS, role_dict
+from app.utils.params import bool_arg
+from app.utils.integrity import is_unique_violation
+from sqlalchemy.exc import IntegrityError
+from app.utils.idempotency import idempotent
 
 bp = Blueprint('role', __name__)
 
 @bp.route('/', methods=['GET'])
 @jwt_required()
 def get_roles():
-    roles = Role.query.all()
-    return jsonify([{
-        'id': role.id,
-        'name': role.name
-    } for role in roles])
+    rows = db.session.execute(select(*ROLE_COLUMNS)).all()
+    return jsonify([role_dict(role) for role in rows])
 
 @bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
 def get_role(id):
     role = Role.query.get_or_404(id)
-    return jsonify({
-        'id': role.id,
-        'name': role.name
-    })
+    return jsonify(role_dict(role))
 
 @bp.route('/', methods=['POST'])
 @jwt_required()
 @role_required('Admin')
+@idempotent
 def create_role():
     data = request.get_json()
     name = data.get('name')
@@ -33,46 +34,72 @@ def create_role():
     if not name:
         return jsonify({'message': 'Role name is required'}), 400
         
-    if Role.query.filter_by(name=name).first():
-        return jsonify({'message': 'Role already exists'}), 400
-        
     role = Role(name=name)
     db.session.add(role)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e, 'name'):
+            return jsonify({'message': 'Role already exists'}), 400
+        raise
     
     return jsonify({
         'message': 'Role created successfully',
-        'role': {'id': role.id, 'name': role.name}
+        'role': role_dict(role)
     }), 201
 
 @bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 @role_required('Admin')
+@idempotent
 def update_role(id):
     role = Role.query.get_or_404(id)
     data = request.get_json()
     
     if 'name' in data:
-        if Role.query.filter(Role.id != id, Role.name == data['name']).first():
-            return jsonify({'message': 'Role name already exists'}), 400
         role.name = data['name']
         
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e, 'name'):
+            return jsonify({'message': 'Role name already exists'}), 400
+        raise
     return jsonify({
         'message': 'Role updated successfully',
-        'role': {'id': role.id, 'name': role.name}
+        'role': role_dict(role)
     })
 
 @bp.route('/<int:id>', methods=['DELETE'])
 @jwt_required()
 @role_required('Admin')
 def delete_role(id):
-    role = Role.query.get_or_404(id)
-    
-    # Cek apakah role masih digunakan
-    if role.users:
+    cascade = bool_arg('cascade')
+
+    # Cek apakah role masih digunakan (EXISTS, tanpa me-load user)
+    if not cascade and db.session.query(exists().where(User.role_id == id)).scalar():
         return jsonify({'message': 'Cannot delete role that is still in use'}), 400
-        
-    db.session.delete(role)
+
+    deleted_users = 0
+    if cascade:
+        # Hapus profil dan user pemilik role dengan DELETE ... WHERE berbasis set
+        role_users = select(User.id).where(User.role_id == id)
+        db.session.execute(delete(KelasMahasiswa).where(KelasMahasiswa.mahasiswa_id.in_(
+            select(Mahasiswa.id).where(Mahasiswa.user_id.in_(role_users))
+        )))
+        db.session.execute(delete(Mahasiswa).where(Mahasiswa.user_id.in_(role_users)))
+        db.session.execute(delete(Dosen).where(Dosen.user_id.in_(role_users)))
+        db.session.execute(update(Job).where(Job.created_by.in_(role_users)).values(created_by=None))
+        deleted_users = db.session.execute(delete(User).where(User.role_id == id)).rowcount
+
+    if not db.session.execute(delete(Role).where(Role.id == id)).rowcount:
+        db.session.rollback()
+        abort(404)
     db.session.commit()
-    return jsonify({'message': 'Role deleted successfully'})
\ No newline at end of file
+
+    result = {'message': 'Role deleted successfully'}
+    if cascade:
+        result['deleted_users'] = deleted_users
+    return jsonify(result)
\ No newline at end of file
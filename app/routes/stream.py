@@ -0,0 +1,49 @@
+from flask import Blueprint, Response, current_app, abort
+from app.models import db, Kelas, Project
+from flask_jwt_extended import jwt_required
+from app.events import get_hub
+
+bp = Blueprint('stream', __name__)
+
+def event_stream(hub, subscription, heartbeat):
+    """Generator SSE: event task, komentar heartbeat, dan `resync` saat overflow"""
+    try:
+        yield 'retry: 3000\n\n'
+        while True:
+            message = subscription.get(heartbeat)
+            if subscription.overflowed:
+                subscription.reset()
+                yield 'event: resync\ndata: {}\n\n'
+            elif message is None:
+                yield ': keep-alive\n\n'
+            else:
+                yield message
+    finally:
+        hub.unsubscribe(subscription)
+
+def stream_topic(topic):
+    hub = get_hub()
+    subscription = hub.subscribe(topic)
+    # Koneksi DB tidak dipakai selama stream terbuka
+    db.session.remove()
+    return Response(
+        event_stream(hub, subscription, current_app.config.get('EVENTS_HEARTBEAT_SECONDS', 15)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# EventSource di browser tidak bisa mengirim header, jadi token juga
+# diterima lewat query string (?jwt=<token>)
+@bp.route('/kelas/<int:id>', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_kelas(id):
+    if db.session.get(Kelas, id) is None:
+        abort(404)
+    return stream_topic(f'kelas:{id}')
+
+@bp.route('/project/<int:project_id>', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_project(project_id):
+    if db.session.get(Project, project_id) is None:
+        abort(404)
+    return stream_topic(f'project:{project_id}')
@@ -1,66 +1,108 @@
-from flask import Blueprint, request, jsonify
-from app.models import db, Task, User, Project, Kelas
+from flask import Blueprint, request, jsonify, abort
+from app.models import db, Task, Project
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
+from datetime import datetime, date, timedelta
 from .decorators import role_required
+from app import queries
+from app.queries import run
+from app.serializers import task_dict
+from app.utils.params import bool_arg, ids_arg, version_arg, page_args, INVALID_PAGE
+from app.includes import include_arg, expanded, expanded_by_ids
+from .responses import query_response, version_conflict, etag
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from app.utils.integrity import is_foreign_key_violation, foreign_key_column
+from app.changes import record_deletes
+from app.events import publish, publish_grouped
+from app.jobs import enqueue, job_handler, report_progress
+from .jobs import job_accepted
+from app.utils.idempotency import idempotent
+from app.utils.single_flight import coalesced
 
 bp = Blueprint('tasks', __name__)
 
+def all_tasks_query():
+    """Query GET /tasks/: batch ?ids=... atau semua task; tuple response bila tidak valid"""
+    try:
+        ids = ids_arg()
+        include = include_arg(Task)
+    except ValueError as e:
+        return {'message': str(e)}, 400
+    if include is not None:
+        if ids is not None:
+            return expanded_by_ids(Task, include, ids)
+        return expanded(Task, include)
+    if ids is not None:
+        return queries.tasks_by_ids(ids, bool_arg('include_archived'))
+    return queries.task_list(bool_arg('include_archived'))
+
 @bp.route('/', methods=['GET'])
 @jwt_required()
+@coalesced()
 def get_all_tasks():
-    tasks = Task.query.all()
-    task_list = [{
-        'id': t.id,
-        'project_id': t.project_id,
-        'kelas_id': t.kelas_id,
-        'title': t.title,
-        'description': t.description,
-        'status': t.status,
-        'due_date': t.due_date.strftime('%Y-%m-%d') if t.due_date else None,
-        'project_name': t.project.name,
-    } for t in tasks]
-    return jsonify(task_list)
+    return query_response(all_tasks_query())
 
 @bp.route('/project/<int:project_id>', methods=['GET'])
 @jwt_required()
+@coalesced()
 def get_project_tasks(project_id):
-    project = Project.query.get_or_404(project_id)
-    tasks = Task.query.filter_by(project_id=project_id).all()
-    
-    task_list = [{
-        'id': t.id,
-        'project_id': t.project_id,
-        'kelas_id': t.kelas_id,
-        'title': t.title,
-        'description': t.description,
-        'status': t.status,
-        'due_date': t.due_date.strftime('%Y-%m-%d') if t.due_date else None,
-        'kelas_name': t.kelas.name
-    } for t in tasks]
+    task_list = run(queries.project_task_list(project_id, bool_arg('include_archived')))
+    if task_list is None:
+        abort(404)
     return jsonify(task_list)
 
 @bp.route('/kelas/<int:kelas_id>', methods=['GET'])
 @jwt_required()
+@coalesced()
 def get_kelas_tasks(kelas_id):
-    kelas = Kelas.query.get_or_404(kelas_id)
-    tasks = Task.query.filter_by(kelas_id=kelas_id).all()
-    
-    task_list = [{
-        'id': t.id,
-        'project_id': t.project_id,
-        'kelas_id': t.kelas_id,
-        'title': t.title,
-        'description': t.description,
-        'status': t.status,
-        'due_date': t.due_date.strftime('%Y-%m-%d') if t.due_date else None,
-        'project_name': t.project.name
-    } for t in tasks]
+    task_list = run(queries.kelas_task_list(kelas_id, bool_arg('include_archived')))
+    if task_list is None:
+        abort(404)
     return jsonify(task_list)
 
+def deadline_scope():
+    """Scope opsional ?kelas_id= / ?project_id= untuk endpoint deadline"""
+    return {
+        'kelas_id': request.args.get('kelas_id', type=int),
+        'project_id': request.args.get('project_id', type=int)
+    }
+
+def upcoming_range():
+    """Rentang (today, until) dari ?days=N, atau None bila tidak valid"""
+    days = request.args.get('days', 7, type=int)
+    if days < 0 or days > 366:
+        return None
+    today = date.today()
+    return today, today + timedelta(days=days)
+
+INVALID_DAYS = {'message': 'days must be between 0 and 366'}
+
+@bp.route('/overdue', methods=['GET'])
+@jwt_required()
+@coalesced()
+def get_overdue_tasks():
+    page = page_args('DEADLINE_TASKS')
+    if page is None:
+        return jsonify(INVALID_PAGE), 400
+    return jsonify(run(queries.overdue_tasks(date.today(), *page, **deadline_scope())))
+
+@bp.route('/upcoming', methods=['GET'])
+@jwt_required()
+@coalesced()
+def get_upcoming_tasks():
+    date_range = upcoming_range()
+    if date_range is None:
+        return jsonify(INVALID_DAYS), 400
+    page = page_args('DEADLINE_TASKS')
+    if page is None:
+        return jsonify(INVALID_PAGE), 400
+    return jsonify(run(queries.upcoming_tasks(*date_range, *page, **deadline_scope())))
+
 @bp.route('/', methods=['POST'])
 @jwt_required()
 @role_required('Admin')  # Hanya admin yang bisa membuat task
+@idempotent
 def create_task():
     data = request.get_json()
     
@@ -69,18 +111,12 @@ def create_task():
     if not all(field in data for field in required_fields):
         return jsonify({'message': 'Missing required fields'}), 400
     
-    # Validasi project dan kelas exist
-    project = Project.query.get(data['project_id'])
-    kelas = Kelas.query.get(data['kelas_id'])
-    
-    if not project or not kelas:
-        return jsonify({'message': 'Project or Kelas not found'}), 404
-    
     try:
         due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date()
     except ValueError:
         return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
 
+    # Project dan kelas divalidasi oleh constraint FK saat INSERT
     new_task = Task(
         project_id=data['project_id'],
         kelas_id=data['kelas_id'],
@@ -91,36 +127,57 @@ def create_task():
     )
     
     db.session.add(new_task)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_foreign_key_violation(e):
+            return jsonify({'message': 'Project or Kelas not found'}), 404
+        raise
     
+    data = task_dict(new_task)
+    publish('task.created', data, [new_task.kelas_id], [new_task.project_id])
     return jsonify({
         'message': 'Task created successfully',
-        'task': {
-            'id': new_task.id,
-            'project_id': new_task.project_id,
-            'kelas_id': new_task.kelas_id,
-            'title': new_task.title,
-            'description': new_task.description,
-            'status': new_task.status,
-            'due_date': new_task.due_date.strftime('%Y-%m-%d')
-        }
+        'task': data
     }), 201
 
+def missing_reference_message(error, data):
+    """Pesan 404 untuk FK project/kelas yang gagal pada update task"""
+    column = foreign_key_column(error)
+    if column is None:
+        # SQLite tidak menyebut kolomnya; cek hanya di jalur gagal
+        candidates = [key for key in ('project_id', 'kelas_id') if key in data]
+        if len(candidates) == 1:
+            column = candidates[0]
+        elif db.session.get(Project, data['project_id']) is None:
+            column = 'project_id'
+        else:
+            column = 'kelas_id'
+    return 'Project not found' if column == 'project_id' else 'Kelas not found'
+
 @bp.route('/<int:task_id>', methods=['PUT'])
 @jwt_required()
 @role_required('Admin')
+@idempotent
 def update_task(task_id):
     task = Task.query.get_or_404(task_id)
     data = request.get_json()
+    try:
+        expected_version = version_arg(data)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    if expected_version is not None and expected_version != task.version:
+        return version_conflict(task.version)
+    # Topik lama juga diberi tahu bila task pindah project / kelas
+    kelas_ids = [task.kelas_id]
+    project_ids = [task.project_id]
     
+    # Project / kelas baru divalidasi oleh constraint FK saat UPDATE
     if 'project_id' in data:
-        if not Project.query.get(data['project_id']):
-            return jsonify({'message': 'Project not found'}), 404
         task.project_id = data['project_id']
         
     if 'kelas_id' in data:
-        if not Kelas.query.get(data['kelas_id']):
-            return jsonify({'message': 'Kelas not found'}), 404
         task.kelas_id = data['kelas_id']
     
     if 'title' in data:
@@ -138,43 +195,115 @@ def update_task(task_id):
         except ValueError:
             return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
     
-    db.session.commit()
+    try:
+        db.session.commit()
+    except StaleDataError:
+        # Task diubah request lain di antara SELECT dan UPDATE
+        db.session.rollback()
+        return version_conflict()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_foreign_key_violation(e):
+            return jsonify({'message': missing_reference_message(e, data)}), 404
+        raise
     
+    task_data = task_dict(task)
+    publish('task.updated', task_data, kelas_ids + [task.kelas_id], project_ids + [task.project_id])
     return jsonify({
         'message': 'Task updated successfully',
-        'task': {
-            'id': task.id,
-            'project_id': task.project_id,
-            'kelas_id': task.kelas_id,
-            'title': task.title,
-            'description': task.description,
-            'status': task.status,
-            'due_date': task.due_date.strftime('%Y-%m-%d')
-        }
-    })
+        'task': task_data
+    }), 200, etag(task.version)
 
 @bp.route('/<int:task_id>', methods=['DELETE'])
 @jwt_required()
 @role_required('Admin')
 def delete_task(task_id):
     task = Task.query.get_or_404(task_id)
+    record_deletes(Task, Task.id == task_id)
     db.session.delete(task)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return version_conflict()
+    publish('task.deleted', {'id': task_id, 'project_id': task.project_id, 'kelas_id': task.kelas_id},
+            [task.kelas_id], [task.project_id])
     return jsonify({'message': 'Task deleted successfully'})
 
 @bp.route('/<int:task_id>/status', methods=['PUT'])
 @jwt_required()
+@idempotent
 def update_task_status(task_id):
     task = Task.query.get_or_404(task_id)
     data = request.get_json()
     
     if 'status' not in data:
         return jsonify({'message': 'Status is required'}), 400
+    try:
+        expected_version = version_arg(data)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    if expected_version is not None and expected_version != task.version:
+        return version_conflict(task.version)
         
     task.status = data['status']
-    db.session.commit()
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return version_conflict()
+    publish('task.updated', task_dict(task), [task.kelas_id], [task.project_id])
     
     return jsonify({
         'message': 'Task status updated successfully',
-        'status': task.status
-    })
\ No newline at end of file
+        'status': task.status,
+        'version': task.version
+    }), 200, etag(task.version)
+
+BULK_BATCH_SIZE = 500
+
+@job_handler('tasks.bulk_status')
+def bulk_status_job(job, payload):
+    """Ubah status banyak task sekaligus, per batch id agar progress terlihat"""
+    filters = []
+    if payload.get('task_ids'):
+        filters.append(Task.id.in_(payload['task_ids']))
+    if payload.get('project_id') is not None:
+        filters.append(Task.project_id == payload['project_id'])
+    if payload.get('kelas_id') is not None:
+        filters.append(Task.kelas_id == payload['kelas_id'])
+
+    tasks = db.session.execute(
+        select(Task.id, Task.project_id, Task.kelas_id).where(*filters).order_by(Task.id)
+    ).all()
+    report_progress(job, 0, len(tasks))
+
+    updated = 0
+    for start in range(0, len(tasks), BULK_BATCH_SIZE):
+        batch = tasks[start:start + BULK_BATCH_SIZE]
+        updated += db.session.execute(
+            update(Task).where(Task.id.in_([task.id for task in batch]))
+            .values(status=payload['status'], version=Task.version + 1)
+        ).rowcount
+        # report_progress meng-commit batch ini
+        report_progress(job, start + len(batch))
+        publish_grouped('tasks.updated', batch, status=payload['status'])
+
+    return {'updated': updated}
+
+@bp.route('/bulk/status', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+@idempotent
+def bulk_update_task_status():
+    data = request.get_json()
+
+    if 'status' not in data:
+        return jsonify({'message': 'Status is required'}), 400
+
+    if not any(data.get(key) is not None for key in ['task_ids', 'project_id', 'kelas_id']):
+        return jsonify({'message': 'One of task_ids, project_id or kelas_id is required'}), 400
+
+    payload = {key: data.get(key) for key in ['status', 'task_ids', 'project_id', 'kelas_id']}
+    job = enqueue('tasks.bulk_status', payload, get_jwt_identity().get('id'))
+    return job_accepted(job)
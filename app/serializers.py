@@ -0,0 +1,96 @@
+from operator import attrgetter
+from sqlalchemy.orm import Bundle
+from .models import Task, Project, Kelas, User, Role, Mahasiswa, Dosen, ArchivedProject, ArchivedTask
+
+
+def serializer(*fields):
+    """Bangun fungsi obj -> dict untuk field tertentu.
+
+    Bekerja untuk objek ORM maupun Row hasil select kolom eksplisit,
+    sehingga route read-only bisa melewati hydration ORM sepenuhnya.
+    """
+    getter = attrgetter(*fields)
+    if len(fields) == 1:
+        return lambda obj: {fields[0]: getter(obj)}
+    return lambda obj: dict(zip(fields, getter(obj)))
+
+
+def columns(model, fields):
+    return tuple(getattr(model, field) for field in fields)
+
+
+TASK_FIELDS = ('id', 'project_id', 'kelas_id', 'title', 'description', 'status', 'due_date', 'version')
+PROJECT_TASK_FIELDS = ('id', 'title', 'description', 'status', 'due_date', 'version')
+KELAS_TASK_FIELDS = PROJECT_TASK_FIELDS + ('project_id',)
+PROJECT_FIELDS = ('id', 'name', 'description', 'start_date', 'end_date', 'status', 'version')
+KELAS_FIELDS = ('id', 'name')
+ROLE_FIELDS = ('id', 'name')
+USER_FIELDS = ('id', 'name', 'email')
+MAHASISWA_FIELDS = ('id', 'nim')
+JOB_FIELDS = ('id', 'type', 'status', 'progress', 'total', 'result', 'error',
+              'created_at', 'started_at', 'finished_at')
+
+TASK_COLUMNS = columns(Task, TASK_FIELDS)
+PROJECT_TASK_COLUMNS = columns(Task, PROJECT_TASK_FIELDS)
+KELAS_TASK_COLUMNS = columns(Task, KELAS_TASK_FIELDS)
+PROJECT_COLUMNS = columns(Project, PROJECT_FIELDS)
+KELAS_COLUMNS = columns(Kelas, KELAS_FIELDS)
+ROLE_COLUMNS = columns(Role, ROLE_FIELDS)
+ARCHIVED_TASK_COLUMNS = columns(ArchivedTask, TASK_FIELDS)
+ARCHIVED_PROJECT_COLUMNS = columns(ArchivedProject, PROJECT_FIELDS)
+USER_COLUMNS = columns(User, USER_FIELDS) + (Role.name.label('role'),)
+PROFILE_USER_BUNDLE = Bundle('user', *columns(User, USER_FIELDS))
+MAHASISWA_COLUMNS = (Bundle('mahasiswa', Mahasiswa.id, Mahasiswa.nim), PROFILE_USER_BUNDLE)
+DOSEN_COLUMNS = (Bundle('dosen', Dosen.id, Dosen.nip), PROFILE_USER_BUNDLE)
+
+task_dict = serializer(*TASK_FIELDS)
+project_task_dict = serializer(*PROJECT_TASK_FIELDS)
+kelas_task_dict = serializer(*KELAS_TASK_FIELDS)
+project_dict = serializer(*PROJECT_FIELDS)
+kelas_dict = serializer(*KELAS_FIELDS)
+role_dict = serializer(*ROLE_FIELDS)
+user_dict = serializer(*USER_FIELDS, 'role')
+_user_dict = serializer(*USER_FIELDS)
+mahasiswa_profile_dict = serializer(*MAHASISWA_FIELDS)
+job_dict = serializer(*JOB_FIELDS)
+
+
+def task_list_dict(row, extra):
+    """task_dict plus satu kolom tambahan (project_name / kelas_name)"""
+    data = task_dict(row)
+    data[extra] = getattr(row, extra)
+    return data
+
+
+def project_detail_task_dict(row):
+    data = project_task_dict(row)
+    data['kelas'] = {
+        'id': row.kelas_id,
+        'name': row.kelas_name
+    } if row.kelas_id is not None else None
+    return data
+
+
+def kelas_project_task_dict(row):
+    data = project_task_dict(row)
+    data['project'] = {
+        'id': row.project_id,
+        'name': row.project_name
+    } if row.project_id is not None else None
+    return data
+
+
+def mahasiswa_dict(mahasiswa, user):
+    return {
+        'id': mahasiswa.id,
+        'nim': mahasiswa.nim,
+        'user': _user_dict(user)
+    }
+
+
+def dosen_dict(dosen, user):
+    return {
+        'id': dosen.id,
+        'nip': dosen.nip,
+        'user': _user_dict(user)
+    }
@@ -0,0 +1,177 @@
+"""Access log terstruktur (JSON lines) tanpa I/O di jalur request.
+
+Setiap request diberi request id (dari header X-Request-ID bila valid,
+atau dibuat baru) yang juga dikirim balik di response. Setelah response
+jadi, satu record berisi endpoint, user id dari JWT, status, latency,
+jumlah query DB dan ukuran response dimasukkan ke queue berukuran tetap;
+serialisasi JSON dan penulisan ke file/stdout dikerjakan thread
+QueueListener. Bila queue penuh, record dibuang (dihitung di `dropped`)
+alih-alih menahan request.
+
+ACCESS_LOG_SAMPLE_RATE membatasi porsi request yang dicatat; response
+5xx dan request yang lebih lambat dari ACCESS_LOG_SLOW_MS selalu dicatat.
+"""
+import atexit
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9._-]{1,128}')
+
+# Counter query per request; ContextVar agar benar juga untuk task asyncio (ASGI)
+_query_count = ContextVar('access_log_query_count', default=None)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class JSONFormatter(logging.Formatter):
+    """Record berisi dict di `msg`; di-serialize di thread listener"""
+
+    def format(self, record):
+        if orjson is not None:
+            return orjson.dumps(record.msg).decode()
+        return json.dumps(record.msg, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler yang tidak memformat di thread request dan membuang record saat queue penuh"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class AccessLog:
+    def __init__(self, handler, queue_size):
+        self.queue = queue.Queue(queue_size)
+        self.handler = DroppingQueueHandler(self.queue)
+        self.target = handler
+        self.listener = None
+        self.pid = None
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger('proman.access')
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.logger.addHandler(self.handler)
+
+    def ensure_started(self):
+        # Thread listener tidak ikut ter-fork (gunicorn preload_app); start per proses
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.listener = QueueListener(self.queue, self.target)
+            self.listener.start()
+            self.pid = os.getpid()
+            atexit.register(self.stop)
+
+    def stop(self):
+        if self.listener is not None and self.pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+            self.pid = None
+
+    def emit(self, entry):
+        self.ensure_started()
+        self.logger.info(entry)
+
+
+def current_user_id():
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        # Endpoint tanpa jwt_required
+        return None
+    return identity.get('id') if isinstance(identity, dict) else identity
+
+
+def init_access_log(app):
+    """Daftarkan hook access log; panggil paling awal agar ukuran response sudah final"""
+    if not app.config.get('ACCESS_LOG_ENABLED', True):
+        return None
+
+    path = app.config.get('ACCESS_LOG_FILE')
+    handler = logging.FileHandler(path) if path else logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JSONFormatter())
+    access_log = AccessLog(handler, app.config.get('ACCESS_LOG_QUEUE_SIZE', 10000))
+    app.extensions['access_log'] = access_log
+
+    sample_rate = app.config.get('ACCESS_LOG_SAMPLE_RATE', 1.0)
+    slow_ms = app.config.get('ACCESS_LOG_SLOW_MS', 1000)
+
+    if not event.contains(Engine, 'before_cursor_execute', _count_query):
+        event.listen(Engine, 'before_cursor_execute', _count_query)
+
+    @app.before_request
+    def start_access_log():
+        incoming = request.headers.get(REQUEST_ID_HEADER)
+        if incoming and REQUEST_ID_PATTERN.fullmatch(incoming):
+            g.request_id = incoming
+        else:
+            g.request_id = uuid.uuid4().hex
+        g.access_log = (time.perf_counter(), _query_count.set([0]))
+
+    @app.after_request
+    def write_access_log(response):
+        state = g.pop('access_log', None)
+        if state is None:
+            return response
+        started, token = state
+        duration_ms = (time.perf_counter() - started) * 1000
+        queries = _query_count.get()[0]
+        _query_count.reset(token)
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+
+        if (sample_rate < 1.0 and response.status_code < 500 and duration_ms < slow_ms
+                and random.random() >= sample_rate):
+            return response
+
+        access_log.emit({
+            'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'request_id': g.request_id,
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'user_id': current_user_id(),
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 3),
+            'queries': queries,
+            'size': response.content_length,
+        })
+        return response
+
+    return access_log
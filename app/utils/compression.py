@@ -0,0 +1,154 @@
+import gzip
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def available_encodings():
+    """Encoding yang bisa dipakai di environment ini, urut preferensi"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append('zstd')
+    if brotli is not None:
+        encodings.append('br')
+    encodings.append('gzip')
+    return encodings
+
+
+def parse_accept_encoding(header):
+    """Ambil encoding dengan q > 0 dari header Accept-Encoding"""
+    accepted = {}
+    for part in header.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, params = part.partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header, allowed):
+    accepted = parse_accept_encoding(header)
+    for encoding in allowed:
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > 0:
+            return encoding
+    return None
+
+
+class Compressor:
+    """Antarmuka compress/flush yang seragam untuk gzip, br dan zstd"""
+
+    def __init__(self, encoding, level):
+        self.encoding = encoding
+        if encoding == 'gzip':
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        elif encoding == 'br':
+            self._obj = brotli.Compressor(quality=min(level, 11))
+        elif encoding == 'zstd':
+            self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            raise ValueError(f'Unsupported encoding: {encoding}')
+
+    def compress(self, data):
+        if self.encoding == 'br':
+            return self._obj.process(data)
+        return self._obj.compress(data)
+
+    def flush(self):
+        """Flush data yang tertahan tanpa menutup stream (untuk streaming)"""
+        if self.encoding == 'gzip':
+            return self._obj.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == 'br':
+            return self._obj.flush()
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._obj.finish()
+        return self._obj.flush()
+
+
+def compress_body(data, encoding, level):
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    compressor = Compressor(encoding, level)
+    return compressor.compress(data) + compressor.finish()
+
+
+def compress_stream(chunks, encoding, level):
+    """Kompres response streaming chunk demi chunk, flush setiap chunk"""
+    compressor = Compressor(encoding, level)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def init_compression(app):
+    """Daftarkan negosiasi kompresi response berdasarkan Accept-Encoding"""
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    allowed = [
+        e for e in available_encodings()
+        if e in app.config.get('COMPRESS_ALGORITHMS', ('zstd', 'br', 'gzip'))
+    ]
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    levels = {
+        'gzip': app.config.get('COMPRESS_LEVEL', 6),
+        'br': app.config.get('COMPRESS_BR_LEVEL', 4),
+        'zstd': app.config.get('COMPRESS_ZSTD_LEVEL', 3),
+    }
+    mimetypes = app.config.get('COMPRESS_MIMETYPES', ('application/json', 'text/event-stream'))
+
+    @app.after_request
+    def compress_response(response):
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return response
+        if 'Content-Encoding' in response.headers or response.direct_passthrough:
+            return response
+        if response.mimetype not in mimetypes:
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''), allowed)
+        if encoding is None:
+            return response
+
+        level = levels[encoding]
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(compress_body(data, encoding, level))
+
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,52 @@
+"""Pemilihan driver MySQL: mysqlclient (C) bila terpasang, fallback pymysql.
+
+MYSQL_DRIVER menentukan pilihan untuk URL `mysql://` / `mysql+pymysql://`
+/ `mysql+mysqldb://`:
+
+    auto     - mysqlclient bila bisa di-import, selain itu pymysql (default)
+    mysqldb  - mysqlclient; fallback pymysql (dengan warning) bila tidak ada
+    pymysql  - selalu pymysql
+
+Decode row di mysqlclient dikerjakan di C, jauh lebih murah untuk
+endpoint list yang besar (lihat benchmarks/bench_drivers.py).
+URL non-MySQL dikembalikan apa adanya.
+"""
+import importlib.util
+import logging
+from sqlalchemy.engine import make_url
+
+MYSQL_DRIVERS = {
+    'mysqldb': ('MySQLdb', 'mysql+mysqldb'),
+    'pymysql': ('pymysql', 'mysql+pymysql'),
+}
+PREFERENCES = {
+    'auto': ('mysqldb', 'pymysql'),
+    'mysqldb': ('mysqldb', 'pymysql'),
+    'pymysql': ('pymysql',),
+}
+
+logger = logging.getLogger(__name__)
+
+
+def available(driver):
+    return importlib.util.find_spec(MYSQL_DRIVERS[driver][0]) is not None
+
+
+def mysql_database_uri(uri, preference='auto'):
+    """URI dengan driver MySQL terbaik yang tersedia sesuai MYSQL_DRIVER"""
+    url = make_url(uri)
+    if url.get_backend_name() != 'mysql':
+        return uri
+    if preference not in PREFERENCES:
+        raise ValueError(f'MYSQL_DRIVER must be one of: {", ".join(PREFERENCES)}')
+
+    candidates = PREFERENCES[preference]
+    driver = next((name for name in candidates if available(name)), candidates[-1])
+    if preference == 'mysqldb' and driver != 'mysqldb':
+        logger.warning('MYSQL_DRIVER=mysqldb but mysqlclient is not installed, falling back to pymysql')
+
+    url = url.set(drivername=MYSQL_DRIVERS[driver][1])
+    # mysqlclient versi lama default ke latin1; samakan dengan pymysql
+    if 'charset' not in url.query:
+        url = url.update_query_dict({'charset': 'utf8mb4'})
+    return url.render_as_string(hide_password=False)
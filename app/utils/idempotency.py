@@ -0,0 +1,224 @@
+"""Dukungan header `Idempotency-Key` untuk handler POST/PUT.
+
+Request pertama dengan sebuah key mengklaim baris `idempotency_key`
+(status pending) sebelum handler dijalankan, lalu menyimpan response-nya.
+Retry dengan key yang sama memutar ulang response tersimpan tanpa
+menjalankan handler lagi, lewat LRU in-process terlebih dulu lalu tabel.
+Key dibatasi per user, method dan path; key yang dipakai ulang dengan body
+berbeda ditolak 422, dan key yang masih diproses dijawab 409.
+
+Baris kedaluwarsa setelah IDEMPOTENCY_TTL_SECONDS dan dibersihkan secara
+berkala oleh request yang mengklaim key baru.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.models import db, IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+STORED_HEADERS = ('Content-Type', 'Location', 'ETag')
+
+
+class ResponseCache:
+    """LRU kecil untuk response yang sudah selesai, di depan tabel"""
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry['expires_at'] <= datetime.utcnow():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+def get_cache():
+    cache = current_app.extensions.get('idempotency_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            'idempotency_cache', ResponseCache(current_app.config.get('IDEMPOTENCY_CACHE_SIZE', 1024))
+        )
+    return cache
+
+
+def _identity():
+    try:
+        verify_jwt_in_request(optional=True)
+    except Exception:
+        return None
+    identity = get_jwt_identity()
+    return identity.get('id') if isinstance(identity, dict) else identity
+
+
+def request_key(header):
+    """(key, fingerprint): key per user+endpoint, fingerprint dari body request"""
+    scope = f'{_identity()}|{request.method}|{request.path}|{header}'
+    key = hashlib.sha256(scope.encode()).hexdigest()
+    fingerprint = hashlib.sha256(request.get_data(cache=True)).hexdigest()
+    return key, fingerprint
+
+
+def replay(entry, fingerprint):
+    if entry['fingerprint'] != fingerprint:
+        return jsonify({'message': f'{HEADER} was already used with a different request body'}), 422
+    response = current_app.response_class(entry['body'], status=entry['status'], headers=entry['headers'])
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _entry(row):
+    return {
+        'fingerprint': row.fingerprint,
+        'status': row.response_status,
+        'body': row.response_body,
+        'headers': row.response_headers or {},
+        'expires_at': row.expires_at,
+    }
+
+
+_last_purge = {'at': 0.0}
+
+
+def purge_expired():
+    """Hapus baris kedaluwarsa, paling sering sekali per IDEMPOTENCY_PURGE_INTERVAL per proses"""
+    interval = current_app.config.get('IDEMPOTENCY_PURGE_INTERVAL', 300)
+    now = time.monotonic()
+    if now - _last_purge['at'] < interval:
+        return
+    _last_purge['at'] = now
+    db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow()))
+    db.session.commit()
+
+
+def claim(key, fingerprint):
+    """Klaim key untuk request ini; return None bila berhasil, atau response replay/konflik"""
+    config = current_app.config
+    ttl = timedelta(seconds=config.get('IDEMPOTENCY_TTL_SECONDS', 86400))
+    lock_timeout = timedelta(seconds=config.get('IDEMPOTENCY_LOCK_TIMEOUT', 60))
+
+    for _ in range(2):
+        now = datetime.utcnow()
+        try:
+            db.session.execute(insert(IdempotencyKey).values(
+                key=key, fingerprint=fingerprint, status='pending', created_at=now, expires_at=now + ttl
+            ))
+            db.session.commit()
+            purge_expired()
+            return None
+        except IntegrityError:
+            db.session.rollback()
+
+        row = db.session.execute(
+            select(IdempotencyKey.__table__).where(IdempotencyKey.key == key)
+        ).first()
+        if row is None:
+            continue
+        if row.expires_at <= now:
+            db.session.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.key == key, IdempotencyKey.expires_at <= now
+            ))
+            db.session.commit()
+            continue
+        if row.fingerprint != fingerprint:
+            return jsonify({'message': f'{HEADER} was already used with a different request body'}), 422
+        if row.status == 'completed':
+            entry = _entry(row)
+            get_cache().put(key, entry)
+            return replay(entry, fingerprint)
+
+        # Pending: ambil alih bila pemilik sebelumnya tampaknya mati
+        if row.created_at <= now - lock_timeout:
+            taken = db.session.execute(update(IdempotencyKey).where(
+                IdempotencyKey.key == key, IdempotencyKey.created_at == row.created_at
+            ).values(created_at=now)).rowcount
+            db.session.commit()
+            if taken:
+                return None
+        return jsonify({'message': f'A request with this {HEADER} is still being processed'}), 409
+
+    return jsonify({'message': f'A request with this {HEADER} is still being processed'}), 409
+
+
+def complete(key, fingerprint, response):
+    # Buang perubahan yang ditinggalkan handler tanpa commit (mis. validasi gagal)
+    db.session.rollback()
+    headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+    body = response.get_data()
+    expires_at = db.session.execute(
+        select(IdempotencyKey.expires_at).where(IdempotencyKey.key == key)
+    ).scalar()
+    db.session.execute(update(IdempotencyKey).where(IdempotencyKey.key == key).values(
+        status='completed', response_status=response.status_code, response_body=body, response_headers=headers
+    ))
+    db.session.commit()
+    get_cache().put(key, {
+        'fingerprint': fingerprint,
+        'status': response.status_code,
+        'body': body,
+        'headers': headers,
+        'expires_at': expires_at or datetime.utcnow(),
+    })
+
+
+def release(key):
+    """Lepas klaim agar request bisa diulang (handler gagal / 5xx)"""
+    db.session.rollback()
+    db.session.execute(delete(IdempotencyKey).where(
+        IdempotencyKey.key == key, IdempotencyKey.status == 'pending'
+    ))
+    db.session.commit()
+
+
+def idempotent(fn):
+    """Hormati header Idempotency-Key; pasang di bawah jwt_required/role_required"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        header = request.headers.get(HEADER)
+        if not header:
+            return fn(*args, **kwargs)
+        if len(header) > 255:
+            return jsonify({'message': f'{HEADER} must be at most 255 characters'}), 400
+
+        key, fingerprint = request_key(header)
+        entry = get_cache().get(key)
+        if entry is not None:
+            return replay(entry, fingerprint)
+
+        conflict = claim(key, fingerprint)
+        if conflict is not None:
+            return conflict
+
+        try:
+            response = current_app.make_response(fn(*args, **kwargs))
+        except Exception:
+            release(key)
+            raise
+
+        if response.status_code >= 500:
+            release(key)
+        else:
+            complete(key, fingerprint, response)
+        return response
+    return wrapper
@@ -0,0 +1,64 @@
+"""Interpretasi IntegrityError dari MySQL, SQLite dan PostgreSQL.
+
+Dipakai oleh handler tulis yang langsung mencoba INSERT/UPDATE lalu
+memetakan pelanggaran constraint (unique / foreign key) ke response
+400/404, alih-alih melakukan SELECT pengecekan lebih dulu.
+"""
+import re
+
+MYSQL_DUPLICATE_ENTRY = 1062
+MYSQL_FOREIGN_KEY = (1216, 1452)
+
+_UNIQUE_PATTERNS = (
+    re.compile(r"for key '([^']+)'"),                    # MySQL
+    re.compile(r'UNIQUE constraint failed: (.+)$', re.M),  # SQLite
+    re.compile(r'Key \(([^)]+)\)=.* already exists'),      # PostgreSQL
+)
+_FOREIGN_KEY_PATTERNS = (
+    re.compile(r'FOREIGN KEY \(`([^`]+)`\)'),              # MySQL
+    re.compile(r'Key \(([^)]+)\)=.* is not present'),      # PostgreSQL
+)
+
+
+def _error_code(error):
+    args = getattr(error.orig, 'args', ())
+    if args and isinstance(args[0], int):
+        return args[0]
+    return None
+
+
+def _names(message, patterns):
+    names = set()
+    for pattern in patterns:
+        for match in pattern.findall(message):
+            for name in match.split(','):
+                # "kelas.name" -> "name"
+                names.add(name.strip().rsplit('.', 1)[-1])
+    return names
+
+
+def _matches(names, column):
+    return any(name == column or name.endswith('_' + column) for name in names)
+
+
+def is_unique_violation(error, column=None):
+    """True bila error adalah pelanggaran unique (opsional: pada kolom tertentu)"""
+    message = str(error.orig)
+    if not (_error_code(error) == MYSQL_DUPLICATE_ENTRY
+            or 'UNIQUE constraint failed' in message
+            or 'duplicate key' in message):
+        return False
+    return column is None or _matches(_names(message, _UNIQUE_PATTERNS), column)
+
+
+def is_foreign_key_violation(error):
+    message = str(error.orig)
+    return (_error_code(error) in MYSQL_FOREIGN_KEY
+            or 'FOREIGN KEY constraint failed' in message
+            or 'violates foreign key constraint' in message)
+
+
+def foreign_key_column(error):
+    """Kolom FK yang gagal, atau None bila database tidak menyebutkannya (SQLite)"""
+    names = _names(str(error.orig), _FOREIGN_KEY_PATTERNS)
+    return next(iter(names)) if len(names) == 1 else None
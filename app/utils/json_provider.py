@@ -0,0 +1,77 @@
+import json
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def default(o):
+    """date/datetime dikirim dalam format ISO (YYYY-MM-DD), bukan format HTTP"""
+    if isinstance(o, (date, datetime)):
+        return o.isoformat()
+    return _default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider yang memakai orjson bila terpasang, fallback ke json stdlib.
+
+    Keduanya meng-encode date/datetime langsung ke ISO, sehingga route
+    cukup mengembalikan objek date tanpa strftime per baris. Karakter
+    non-ASCII dikirim sebagai UTF-8 apa adanya di kedua jalur.
+    """
+
+    default = staticmethod(default)
+    ensure_ascii = False
+
+    def _orjson_dumps(self, obj, kwargs):
+        """Return bytes via orjson, atau None bila ada argumen yang tidak didukung"""
+        if orjson is None:
+            return None
+        if set(kwargs) - {'sort_keys', 'indent', 'separators', 'ensure_ascii', 'default'}:
+            return None
+        # orjson selalu menulis UTF-8; escape \uXXXX hanya lewat json stdlib
+        if kwargs.get('ensure_ascii', self.ensure_ascii):
+            return None
+
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option)
+
+    def dumps_bytes(self, obj, **kwargs):
+        data = self._orjson_dumps(obj, kwargs)
+        if data is not None:
+            return data
+        return self.dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        data = self._orjson_dumps(obj, kwargs)
+        if data is not None:
+            return data.decode('utf-8')
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        dump_args = {}
+
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            dump_args['indent'] = 2
+        else:
+            dump_args['separators'] = (',', ':')
+
+        return self._app.response_class(
+            self.dumps_bytes(obj, **dump_args) + b'\n', mimetype=self.mimetype
+        )
@@ -0,0 +1,77 @@
+from flask import current_app, request
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+INVALID_PAGE = {'message': 'page and per_page must be positive integers'}
+
+
+def bool_arg(name, default=False):
+    """Baca query string boolean seperti ?cascade=true"""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    return value.lower() in TRUE_VALUES
+
+
+def page_args(prefix):
+    """(page, per_page) dari query string, atau None bila tidak valid.
+
+    Default dan batas per_page dari Config <prefix>_PER_PAGE / <prefix>_MAX_PER_PAGE.
+    """
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', current_app.config[f'{prefix}_PER_PAGE'], type=int)
+    if page < 1 or per_page < 1:
+        return None
+    return page, min(per_page, current_app.config[f'{prefix}_MAX_PER_PAGE'])
+
+
+def ids_arg(name='ids'):
+    """Id unik dari ?ids=1,2,3 (atau ?ids=1&ids=2), urutan dipertahankan.
+
+    None bila parameter tidak ada; ValueError bila ada nilai yang bukan
+    integer atau jumlahnya melebihi BATCH_MAX_IDS.
+    """
+    values = request.args.getlist(name)
+    if not values:
+        return None
+
+    ids = {}
+    for value in values:
+        for part in value.split(','):
+            part = part.strip()
+            if part:
+                try:
+                    ids[int(part)] = None
+                except ValueError:
+                    raise ValueError(f'{name} must be a comma-separated list of integers')
+
+    limit = current_app.config.get('BATCH_MAX_IDS', 100)
+    if not ids or len(ids) > limit:
+        raise ValueError(f'{name} must contain between 1 and {limit} ids')
+    return list(ids)
+
+
+def version_arg(data=None):
+    """Versi yang diharapkan klien dari header If-Match ("3", W/"3") atau field `version` di body.
+
+    None bila tidak ada (atau If-Match: *); ValueError bila bukan integer.
+    """
+    value = request.headers.get('If-Match')
+    if value is not None:
+        value = value.strip()
+        if value == '*':
+            return None
+        if value.startswith('W/'):
+            value = value[2:]
+        value = value.strip('"')
+    elif isinstance(data, dict) and data.get('version') is not None:
+        value = data['version']
+    else:
+        return None
+
+    if isinstance(value, bool):
+        raise ValueError('version must be an integer')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError('version must be an integer')
@@ -0,0 +1,215 @@
+"""Profiler per request untuk admin: `?_profile=1` atau header `X-Profile: 1`.
+
+Request yang diminta diprofil (dan token-nya milik Admin) dijalankan
+dengan sampling profiler: thread terpisah mengambil stack thread request
+setiap PROFILE_SAMPLE_INTERVAL_MS dan menyimpannya dalam format folded
+stacks (bisa dibuka langsung di flamegraph.pl / speedscope). Semua
+statement SQL beserta durasinya dicatat lewat event engine. Response
+asli dibungkus dalam envelope JSON bersama hasil profil, dan bila
+PROFILE_DIR diset, folded stacks juga disimpan ke file.
+
+Mati secara default; nyalakan dengan env PROFILER_ENABLED=true. Tanpa
+flag tersebut, satu-satunya biaya adalah pengecekan query string dan
+header; listener SQL hanya terpasang selama ada request yang diprofil.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from flask import request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .params import TRUE_VALUES
+
+PROFILE_KEY = 'proman.profile'
+
+
+def frame_name(frame):
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class Sampler:
+    """Sampling profiler untuk satu thread; hasil dalam format folded stacks.
+
+    Selama ada sampler aktif, switch interval GIL diturunkan ke interval
+    sampling; dengan default 5ms, request yang singkat dan CPU-bound tidak
+    akan pernah tersampel.
+    """
+
+    _lock = threading.Lock()
+    _running = 0
+    _switch_interval = None
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='profiler', daemon=True)
+
+    def start(self):
+        with self._lock:
+            if Sampler._running == 0:
+                Sampler._switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(min(self.interval, Sampler._switch_interval))
+            Sampler._running += 1
+        self.thread.start()
+
+    def stop(self):
+        if self.stopped.is_set():
+            return
+        self.stopped.set()
+        self.thread.join()
+        with self._lock:
+            Sampler._running -= 1
+            if Sampler._running == 0:
+                sys.setswitchinterval(Sampler._switch_interval)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def folded(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class SQLRecorder:
+    """Catat statement SQL per thread; listener engine hanya aktif bila ada recorder"""
+
+    _lock = threading.Lock()
+    _active = {}
+
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.statements = []
+
+    def start(self):
+        with self._lock:
+            if not self._active:
+                event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            self._active[self.thread_id] = self
+
+    def stop(self):
+        with self._lock:
+            self._active.pop(self.thread_id, None)
+            if not self._active:
+                event.remove(Engine, 'before_cursor_execute', _before_cursor_execute)
+                event.remove(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if threading.get_ident() in SQLRecorder._active:
+        conn.info.setdefault('profile_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    recorder = SQLRecorder._active.get(threading.get_ident())
+    starts = conn.info.get('profile_query_start')
+    if recorder is None or not starts:
+        return
+    recorder.statements.append({
+        'statement': statement,
+        'duration_ms': round((time.perf_counter() - starts.pop()) * 1000, 3),
+        'executemany': executemany,
+        'rowcount': cursor.rowcount,
+    })
+
+
+def profile_requested():
+    return (request.args.get('_profile', '').lower() in TRUE_VALUES
+            or request.headers.get('X-Profile', '').lower() in TRUE_VALUES)
+
+
+def is_admin():
+    try:
+        verify_jwt_in_request(optional=True)
+    except Exception:
+        return False
+    current_user = get_jwt_identity()
+    return current_user is not None and current_user.get('role') == 'Admin'
+
+
+def init_profiler(app):
+    """Daftarkan hook profiling per request (hanya untuk Admin yang meminta)"""
+    if not app.config.get('PROFILER_ENABLED', False):
+        return
+
+    interval = app.config.get('PROFILE_SAMPLE_INTERVAL_MS', 1) / 1000
+    profile_dir = app.config.get('PROFILE_DIR')
+
+    @app.before_request
+    def start_profile():
+        if not profile_requested() or not is_admin():
+            return
+        thread_id = threading.get_ident()
+        # Disimpan di environ, bukan g: sub-request POST /batch berbagi g dengan request induk
+        profile = (time.perf_counter(), Sampler(thread_id, interval), SQLRecorder(thread_id))
+        request.environ[PROFILE_KEY] = profile
+        profile[2].start()
+        profile[1].start()
+
+    @app.teardown_request
+    def stop_profile(exc):
+        # Pastikan sampler/listener berhenti walau after_request tidak berjalan
+        profile = request.environ.pop(PROFILE_KEY, None)
+        if profile is not None:
+            profile[1].stop()
+            profile[2].stop()
+
+    @app.after_request
+    def attach_profile(response):
+        profile = request.environ.pop(PROFILE_KEY, None)
+        if profile is None:
+            return response
+
+        started, sampler, recorder = profile
+        sampler.stop()
+        recorder.stop()
+        duration_ms = (time.perf_counter() - started) * 1000
+        if response.mimetype == 'text/event-stream':
+            return response
+
+        folded = sampler.folded()
+        result = {
+            'endpoint': request.endpoint,
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 3),
+            'sampling_interval_ms': interval * 1000,
+            'samples': sampler.samples,
+            'folded': folded,
+            'sql': {
+                'count': len(recorder.statements),
+                'total_ms': round(sum(s['duration_ms'] for s in recorder.statements), 3),
+                'statements': recorder.statements,
+            },
+        }
+
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+            path = os.path.join(profile_dir, f'{time.strftime("%Y%m%d-%H%M%S")}-{request.endpoint}.folded')
+            with open(path, 'w') as f:
+                f.write(folded)
+            result['stored_at'] = path
+
+        body = response.get_json(silent=True) if response.is_json else None
+        envelope = app.json.response({
+            'profile': result,
+            'response': body if body is not None else response.get_data(as_text=True),
+        })
+        envelope.status_code = response.status_code
+        return envelope
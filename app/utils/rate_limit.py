@@ -0,0 +1,153 @@
+"""Rate limit token bucket untuk endpoint tanpa autentikasi (login/register).
+
+Setiap request mengambil satu token dari bucket per IP dan per email.
+Bucket terisi ulang secara kontinu sesuai limit `"<kapasitas>/<detik>"`
+dari Config (mis. RATE_LIMIT_LOGIN_IP = '20/60': burst 20, isi ulang 20
+token per 60 detik). Bila bucket kosong, request dijawab 429 dengan
+Retry-After sebelum handler (dan bcrypt) dijalankan.
+
+Backend menentukan jangkauan bucket:
+
+    local  - per proses worker (default)
+    redis  - dibagi semua worker lewat script Lua atomik (paket `redis`)
+
+IP diambil dari request.remote_addr; di belakang reverse proxy pasang
+ProxyFix agar yang terhitung adalah IP klien, bukan IP proxy.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, jsonify, request
+
+KEY_PREFIX = 'proman:ratelimit:'
+
+
+def parse_limit(value):
+    """'20/60' -> (kapasitas 20, 20/60 token per detik); None/'' berarti tanpa limit"""
+    if not value:
+        return None
+    capacity, _, period = str(value).partition('/')
+    capacity, period = int(capacity), float(period or 1)
+    if capacity <= 0 or period <= 0:
+        raise ValueError(f'Invalid rate limit {value!r}')
+    return capacity, capacity / period
+
+
+class LocalBackend:
+    """Bucket in-process; jumlah key dibatasi agar email acak tidak menghabiskan memori"""
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, rate):
+        """Ambil satu token; return 0 bila diizinkan, atau detik sampai token tersedia"""
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            retry_after = 0 if tokens >= 1 else (1 - tokens) / rate
+            if not retry_after:
+                tokens -= 1
+            self.buckets[key] = (tokens, now)
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return retry_after
+
+
+# KEYS[1] = key bucket; ARGV = kapasitas, token per detik. Waktu dari server Redis
+# agar semua worker memakai jam yang sama.
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisBackend:
+    """Bucket bersama semua worker; satu round trip EVALSHA per bucket"""
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(TAKE_SCRIPT)
+
+    def take(self, key, capacity, rate):
+        return float(self.script(keys=[KEY_PREFIX + key], args=[capacity, rate]))
+
+
+class RateLimiter:
+    def __init__(self, backend, config):
+        self.backend = backend
+        self.config = config
+        self.limits = {}
+
+    def limit(self, name):
+        """Limit (kapasitas, rate) untuk RATE_LIMIT_<NAME>, di-parse sekali"""
+        if name not in self.limits:
+            self.limits[name] = parse_limit(self.config.get(f'RATE_LIMIT_{name.upper()}'))
+        return self.limits[name]
+
+    def check(self, name, identifier):
+        """0 bila diizinkan, atau detik Retry-After"""
+        limit = self.limit(name)
+        if limit is None or not identifier:
+            return 0
+        return self.backend.take(f'{name}:{identifier}', *limit)
+
+
+def init_rate_limit(app):
+    if not app.config.get('RATE_LIMIT_ENABLED', True):
+        return None
+    if app.config.get('RATE_LIMIT_BACKEND', 'local') == 'redis':
+        backend = RedisBackend(app.config['RATE_LIMIT_REDIS_URL'])
+    else:
+        backend = LocalBackend(app.config.get('RATE_LIMIT_MAX_KEYS', 100000))
+    limiter = RateLimiter(backend, app.config)
+    app.extensions['rate_limit'] = limiter
+    return limiter
+
+
+def too_many_requests(retry_after):
+    return jsonify({'message': 'Too many requests, please try again later'}), 429, {
+        'Retry-After': str(max(1, math.ceil(retry_after)))
+    }
+
+
+def rate_limited(name, email_field='email'):
+    """Batasi endpoint per IP (RATE_LIMIT_<NAME>_IP) dan per email (RATE_LIMIT_<NAME>_EMAIL)"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            limiter = current_app.extensions.get('rate_limit')
+            if limiter is not None:
+                retry_after = limiter.check(f'{name}_ip', request.remote_addr)
+                if not retry_after:
+                    data = request.get_json(silent=True)
+                    email = data.get(email_field) if isinstance(data, dict) else None
+                    if isinstance(email, str):
+                        retry_after = limiter.check(f'{name}_email', email.strip().lower())
+                if retry_after:
+                    return too_many_requests(retry_after)
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
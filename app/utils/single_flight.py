@@ -0,0 +1,159 @@
+"""Single-flight untuk handler GET read-only.
+
+Request GET identik yang datang bersamaan dalam satu worker (endpoint,
+view args, query string dan scope otorisasi sama) tidak masing-masing
+menjalankan query: request pertama menjadi leader, sisanya menunggu
+hasilnya lalu memakai body JSON yang sudah di-serialize leader. Saat
+ratusan mahasiswa membuka GET /kelas/<id>/tasks bersamaan, DB cukup
+melayani satu set query.
+
+Yang dibagi hanya response view (body, status, header dari jsonify);
+hook after_request (kompresi, access log, request id) tetap berjalan per
+request. Commit di worker ini menaikkan generasi, sehingga GET setelah
+write tidak ikut menunggu leader yang mulai sebelum write tersebut.
+Bila leader gagal dengan error non-HTTP atau melewati
+SINGLE_FLIGHT_TIMEOUT, follower menjalankan handler sendiri.
+
+Mode ASGI (app/asgi.py) memakai `do_async` dengan aturan yang sama,
+dibaca dari atribut `single_flight` di view function.
+"""
+import asyncio
+import threading
+from functools import wraps
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from werkzeug.exceptions import HTTPException
+
+# Naik setiap commit di proses ini; bagian dari key single-flight
+_generation = [0]
+
+
+def _bump_generation(session):
+    _generation[0] += 1
+
+
+class Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.outcome = (None, None)
+
+
+class SingleFlight:
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.calls = {}
+        self.futures = {}
+        self.lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key, fn):
+        """Jalankan fn() sekali untuk semua pemanggil key yang sama yang bersamaan"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Call()
+
+        if not leader:
+            if call.event.wait(self.timeout):
+                result, error = call.outcome
+                if error is not None:
+                    raise error
+                if result is not None:
+                    self.shared += 1
+                    return result
+            return fn()
+
+        try:
+            result = fn()
+            call.outcome = (result, None)
+            return result
+        except HTTPException as e:
+            call.outcome = (None, e)
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+
+    async def do_async(self, key, fn):
+        """Padanan do() untuk coroutine; dict futures hanya disentuh dari event loop"""
+        future = self.futures.get(key)
+        if future is not None:
+            try:
+                result, error = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            except asyncio.TimeoutError:
+                result, error = None, None
+            if error is not None:
+                raise error
+            if result is not None:
+                self.shared += 1
+                return result
+            return await fn()
+
+        future = self.futures[key] = asyncio.get_running_loop().create_future()
+        outcome = (None, None)
+        try:
+            result = await fn()
+            outcome = (result, None)
+            return result
+        except HTTPException as e:
+            outcome = (None, e)
+            raise
+        finally:
+            del self.futures[key]
+            future.set_result(outcome)
+
+
+def init_single_flight(app):
+    if not app.config.get('SINGLE_FLIGHT_ENABLED', True):
+        return None
+    if not event.contains(Session, 'after_commit', _bump_generation):
+        event.listen(Session, 'after_commit', _bump_generation)
+    single_flight = SingleFlight(app.config.get('SINGLE_FLIGHT_TIMEOUT', 5))
+    app.extensions['single_flight'] = single_flight
+    return single_flight
+
+
+def flight_key(per_user=False):
+    """Key request saat ini; scope = role, atau user id bila hasilnya per user"""
+    identity = get_jwt_identity()
+    if isinstance(identity, dict):
+        identity = identity.get('id') if per_user else identity.get('role')
+    return (
+        request.endpoint,
+        tuple(sorted(request.view_args.items())),
+        tuple(sorted(request.args.items(multi=True))),
+        identity,
+        _generation[0],
+    )
+
+
+def serialized(rv):
+    """(body, status, header) dari return value view"""
+    response = current_app.make_response(rv)
+    return response.get_data(), response.status_code, list(response.headers.items())
+
+
+def shared_response(result):
+    body, status, headers = result
+    return current_app.response_class(body, status=status, headers=headers)
+
+
+def coalesced(per_user=False):
+    """Bagi hasil handler GET ke request identik yang bersamaan; pasang di bawah jwt_required"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            single_flight = current_app.extensions.get('single_flight')
+            if single_flight is None:
+                return fn(*args, **kwargs)
+            return shared_response(single_flight.do(
+                flight_key(per_user), lambda: serialized(fn(*args, **kwargs))
+            ))
+        # Dibaca mode ASGI lewat app.view_functions (ikut tersalin oleh @wraps di atasnya)
+        wrapper.single_flight = {'per_user': per_user}
+        return wrapper
+    return decorator
@@ -0,0 +1,64 @@
+"""Benchmark serialisasi JSON untuk payload 50k task.
+
+Membandingkan provider bawaan Flask (dengan strftime per tanggal, seperti
+route sebelumnya) dengan FastJSONProvider (objek date di-encode langsung).
+
+    python benchmarks/bench_json.py
+"""
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.json_provider import FastJSONProvider, orjson  # noqa: E402
+
+N_TASKS = 50_000
+ROUNDS = 5
+
+
+def build_rows():
+    start = date(2024, 1, 1)
+    return [{
+        'id': i,
+        'project_id': i % 200,
+        'kelas_id': i % 40,
+        'title': f'Task {i}',
+        'description': 'Lorem ipsum dolor sit amet ' * 3,
+        'status': 'In Progress',
+        'due_date': start + timedelta(days=i % 365),
+        'project_name': f'Project {i % 200}',
+    } for i in range(N_TASKS)]
+
+
+def bench(name, provider, build):
+    best = None
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        data = provider.response(build()).get_data()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    print(f'{name:<32} {best * 1000:8.1f} ms  {N_TASKS / best:12,.0f} tasks/s  {len(data):>10,} bytes')
+
+
+def main():
+    app = Flask(__name__)
+    rows = build_rows()
+
+    def with_strftime():
+        return [dict(r, due_date=r['due_date'].strftime('%Y-%m-%d')) for r in rows]
+
+    def with_dates():
+        return rows
+
+    print(f'{N_TASKS:,} tasks, best of {ROUNDS} (orjson: {"yes" if orjson else "no"})')
+    bench('DefaultJSONProvider + strftime', DefaultJSONProvider(app), with_strftime)
+    bench('FastJSONProvider', FastJSONProvider(app), with_dates)
+
+
+if __name__ == '__main__':
+    main()
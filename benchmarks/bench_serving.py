@@ -0,0 +1,106 @@
+"""Bandingkan throughput dev server (run.py) dengan gunicorn.conf.py.
+
+Membuat database SQLite sementara berisi data contoh, menjalankan
+masing-masing server, lalu menembak GET /kelas/ dan GET /projects/ dari
+beberapa thread klien selama DURATION detik.
+
+    python benchmarks/bench_serving.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PORT = 8765
+DURATION = 10
+CLIENTS = 16
+PATHS = ['/kelas/', '/projects/']
+
+
+def prepare_database(uri):
+    os.environ['DATABASE_URL'] = uri
+    from flask_jwt_extended import create_access_token
+    from app import create_app, create_roles
+    from app.models import db, Kelas, Project, Task
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        create_roles()
+        kelas = [Kelas(name=f'Kelas {i}') for i in range(10)]
+        projects = [Project(name=f'Project {i}', start_date=date(2024, 1, 1),
+                            end_date=date(2024, 12, 31), status='In Progress') for i in range(20)]
+        db.session.add_all(kelas + projects)
+        db.session.flush()
+        db.session.add_all(Task(project_id=projects[i % 20].id, kelas_id=kelas[i % 10].id,
+                                title=f'Task {i}', due_date=date(2024, 1, 1) + timedelta(days=i % 300))
+                           for i in range(1000))
+        db.session.commit()
+        return create_access_token(identity='1')
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except urllib.error.HTTPError:
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('server did not start')
+
+
+def load(token):
+    counts = [0] * CLIENTS
+    stop = time.time() + DURATION
+
+    def client(n):
+        headers = {'Authorization': f'Bearer {token}'}
+        while time.time() < stop:
+            req = urllib.request.Request(f'http://127.0.0.1:{PORT}{PATHS[counts[n] % len(PATHS)]}', headers=headers)
+            urllib.request.urlopen(req).read()
+            counts[n] += 1
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(CLIENTS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts) / DURATION
+
+
+def bench(name, cmd, token, env):
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(f'http://127.0.0.1:{PORT}/roles/')
+        rps = load(token)
+        print(f'{name:<40} {rps:10.1f} req/s')
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    uri = f'sqlite:///{os.path.join(tmp, "bench.db")}'
+    token = prepare_database(uri)
+    env = dict(os.environ, DATABASE_URL=uri, BIND=f'127.0.0.1:{PORT}')
+
+    print(f'{CLIENTS} clients, {DURATION}s each, {os.cpu_count()} core(s)')
+    bench('dev server (threaded, no debug)',
+          [sys.executable, '-m', 'flask', '--app', 'run', 'run', '--port', str(PORT), '--with-threads'], token, env)
+    bench(f'gunicorn ({os.cpu_count()} workers, preload)',
+          [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'], token, env)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Ukur waktu startup aplikasi.
+
+Mengukur create_app() di dalam proses (tanpa akses DB) dan waktu cold
+start proses baru sampai aplikasi siap (import + create_app).
+
+    python benchmarks/bench_startup.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ROUNDS = 10
+COLD_START = 'import time; t0 = time.perf_counter(); from app import create_app; create_app(); print((time.perf_counter() - t0) * 1000)'
+
+
+def main():
+    from app import create_app
+
+    warm = []
+    for _ in range(ROUNDS):
+        app = create_app()
+        warm.append(app.config['STARTUP_TIME_MS'])
+
+    cold = []
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', COLD_START], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        cold.append(((time.perf_counter() - t0) * 1000, float(out.stdout.strip())))
+
+    print(f'create_app() in-process      median {statistics.median(warm):7.1f} ms')
+    print(f'import + create_app (child)  median {statistics.median(c[1] for c in cold):7.1f} ms')
+    print(f'process spawn to ready       median {statistics.median(c[0] for c in cold):7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""Konfigurasi serving produksi.
+
+    gunicorn -c gunicorn.conf.py
+
+Aplikasi di-load sekali di master (preload_app) lalu di-fork ke
+WEB_CONCURRENCY worker (default: jumlah core). Setiap worker membuang
+pool koneksi warisan master setelah fork, dan di-recycle dengan graceful
+setelah MAX_REQUESTS request (+ jitter agar tidak restart bersamaan).
+"""
+import os
+from config import Config
+
+wsgi_app = 'run:app'
+bind = os.getenv('BIND', '0.0.0.0:8000')
+
+workers = Config.WEB_CONCURRENCY
+worker_class = os.getenv('WORKER_CLASS', 'gthread')
+threads = int(os.getenv('THREADS', 4))
+preload_app = True
+
+max_requests = Config.MAX_REQUESTS
+max_requests_jitter = Config.MAX_REQUESTS_JITTER
+graceful_timeout = int(os.getenv('GRACEFUL_TIMEOUT', 30))
+timeout = int(os.getenv('TIMEOUT', 60))
+
+accesslog = os.getenv('ACCESS_LOG')
+
+
+def post_fork(server, worker):
+    # Socket pool milik master tidak boleh dipakai bersama antar worker
+    from app import reset_db_pool
+    from run import app
+
+    reset_db_pool(app)
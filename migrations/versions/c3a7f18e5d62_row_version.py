@@ -0,0 +1,31 @@
+"""Add version column for optimistic concurrency on task and project.
+
+Revision ID: c3a7f18e5d62
+Revises: b6e4d92f0c15
+Create Date: 2026-10-19 19:10:27.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a7f18e5d62'
+down_revision = 'b6e4d92f0c15'
+branch_labels = None
+depends_on = None
+
+# Tabel arsip ikut menyimpan versi terakhir saat project diarsipkan
+TABLES = ('project', 'task', 'archived_project', 'archived_task')
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('version')
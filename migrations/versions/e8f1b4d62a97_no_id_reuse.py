@@ -0,0 +1,53 @@
+"""Never reuse project and task ids held by archived rows.
+
+Revision ID: e8f1b4d62a97
+Revises: c3a7f18e5d62
+Create Date: 2026-10-19 21:40:12.318406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8f1b4d62a97'
+down_revision = 'c3a7f18e5d62'
+branch_labels = None
+depends_on = None
+
+# Tabel aktif -> tabel arsip yang memegang id lamanya
+TABLES = (('project', 'archived_project'), ('task', 'archived_task'))
+
+
+def next_id(table, archived):
+    """Id berikutnya yang tidak bentrok dengan baris aktif maupun arsip"""
+    bind = op.get_bind()
+    return max(
+        bind.execute(sa.text(f'SELECT COALESCE(MAX(id), 0) FROM {table}')).scalar(),
+        bind.execute(sa.text(f'SELECT COALESCE(MAX(id), 0) FROM {archived}')).scalar(),
+    ) + 1
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for table, archived in TABLES:
+        if dialect == 'sqlite':
+            # Tanpa AUTOINCREMENT SQLite memakai MAX(id) + 1, sehingga id project/task
+            # yang sudah diarsipkan dipakai lagi
+            with op.batch_alter_table(table, recreate='always',
+                                      table_kwargs={'sqlite_autoincrement': True}):
+                pass
+            op.execute(sa.text('DELETE FROM sqlite_sequence WHERE name = :name').bindparams(name=table))
+            op.execute(sa.text('INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)')
+                       .bindparams(name=table, seq=next_id(table, archived) - 1))
+        elif dialect == 'mysql':
+            # Counter AUTO_INCREMENT bisa sudah turun ke MAX(id) + 1 setelah restart (< 8.0)
+            op.execute(f'ALTER TABLE {table} AUTO_INCREMENT = {next_id(table, archived)}')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for table, _ in reversed(TABLES):
+            with op.batch_alter_table(table, recreate='always',
+                                      table_kwargs={'sqlite_autoincrement': False}):
+                pass
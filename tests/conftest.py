@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from config import Config  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(Config, 'ACCESS_LOG_ENABLED', False)
+    monkeypatch.setattr(Config, 'JOBS_RUN_IN_APP', False)
+    monkeypatch.setattr(Config, 'SEED_ROLES_ON_FIRST_REQUEST', False)
+    # Identity JWT berupa dict; PyJWT baru menolak `sub` non-string saat verifikasi
+    monkeypatch.setattr(Config, 'JWT_VERIFY_SUB', False, raising=False)
+
+    from app import create_app, create_roles
+    from app.models import db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        create_roles()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers(app):
+    with app.app_context():
+        token = create_access_token(identity={'id': 1, 'email': 'admin@example.com', 'role': 'Admin'})
+    return {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,28 @@
+"""Arsip project Completed (app/archive.py)."""
+from app.archive import archive_projects
+
+
+def create_project(client, headers):
+    project = client.post('/projects/', json={
+        'name': 'P', 'start_date': '2020-01-01', 'end_date': '2020-02-01', 'status': 'Completed'
+    }, headers=headers).get_json()['project']
+    task = client.post('/tasks/', json={
+        'project_id': project['id'], 'kelas_id': 1, 'title': 'T', 'due_date': '2020-01-15'
+    }, headers=headers).get_json()['task']
+    return project['id'], task['id']
+
+
+def test_ids_of_archived_rows_are_not_reused(app, client, admin_headers):
+    client.post('/kelas/', json={'name': 'K'}, headers=admin_headers)
+    archived = [create_project(client, admin_headers) for _ in range(2)]
+    with app.app_context():
+        assert archive_projects(30, 10)['archived_projects'] == 2
+
+    project_id, task_id = create_project(client, admin_headers)
+    assert project_id > max(p for p, _ in archived)
+    assert task_id > max(t for _, t in archived)
+
+    with app.app_context():
+        assert archive_projects(30, 10)['archived_projects'] == 1
+    ids = [p['id'] for p in client.get('/projects/?include_archived=true', headers=admin_headers).get_json()]
+    assert sorted(ids) == [1, 2, 3]
@@ -0,0 +1,53 @@
+"""POST /batch (app/routes/batch.py)."""
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def seeded(client, admin_headers):
+    assert client.post('/kelas/', json={'name': 'K1'}, headers=admin_headers).status_code == 201
+    assert client.post('/projects/', json={
+        'name': 'P', 'start_date': '2026-01-01', 'end_date': '2026-12-31', 'status': 'In Progress'
+    }, headers=admin_headers).status_code == 201
+    assert client.post('/tasks/', json={
+        'project_id': 1, 'kelas_id': 1, 'title': 'T', 'due_date': '2026-10-01'
+    }, headers=admin_headers).status_code == 201
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_batch_matches_individual_requests(client, admin_headers, seeded, parallel):
+    paths = ['/projects/', '/kelas/1/tasks', '/tasks', '/roles/', '/projects/99']
+    response = client.post('/batch', json={
+        'parallel': parallel, 'requests': [{'id': i, 'path': path} for i, path in enumerate(paths)]
+    }, headers=admin_headers)
+
+    assert response.status_code == 200
+    entries = response.get_json()['responses']
+    assert [e['id'] for e in entries] == list(range(len(paths)))
+    for path, entry in zip(paths, entries):
+        expected = client.get(path, headers=admin_headers, follow_redirects=True)
+        assert entry['status'] == expected.status_code, path
+        if expected.status_code == 200:
+            assert entry['body'] == expected.get_json(), path
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_batch_rejects_streams_without_hanging(client, admin_headers, seeded, parallel):
+    responses = []
+    thread = threading.Thread(target=lambda: responses.append(client.post('/batch/', json={
+        'parallel': parallel, 'requests': [{'path': '/stream/kelas/1'}, {'path': '/kelas/1/tasks'}]
+    }, headers=admin_headers)), daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive(), 'batch with an SSE sub-request did not return'
+    [stream, tasks] = responses[0].get_json()['responses']
+    assert stream == {'id': 0, 'status': 400, 'body': {'message': 'Endpoint cannot be batched'}}
+    assert tasks['status'] == 200
+
+
+def test_batch_rejects_non_get(client, admin_headers):
+    response = client.post('/batch', json={'requests': [{'path': '/projects/', 'method': 'POST'}]},
+                           headers=admin_headers)
+    assert response.get_json()['responses'][0]['status'] == 405
@@ -0,0 +1,33 @@
+"""GET /tasks/overdue dan /tasks/upcoming."""
+from datetime import date, timedelta
+
+
+def create_tasks(client, headers, due_dates):
+    client.post('/kelas/', json={'name': 'K'}, headers=headers)
+    project = client.post('/projects/', json={
+        'name': 'P', 'start_date': '2020-01-01', 'end_date': '2030-01-01', 'status': 'In Progress'
+    }, headers=headers).get_json()['project']
+    for due in due_dates:
+        client.post('/tasks/', json={
+            'project_id': project['id'], 'kelas_id': 1, 'title': 'T', 'due_date': due.isoformat()
+        }, headers=headers)
+
+
+def test_overdue_is_paginated_with_counts_per_date(client, admin_headers):
+    today = date.today()
+    create_tasks(client, admin_headers, [today - timedelta(days=2)] * 3 + [today - timedelta(days=1)] * 2)
+
+    first = client.get('/tasks/overdue?per_page=2', headers=admin_headers).get_json()
+    assert first['total'] == 5 and first['has_more']
+    assert [(b['count'], len(b['tasks'])) for b in first['buckets']] == [(3, 2)]
+
+    second = client.get('/tasks/overdue?per_page=2&page=2', headers=admin_headers).get_json()
+    assert [(b['count'], len(b['tasks'])) for b in second['buckets']] == [(3, 1), (2, 1)]
+
+    last = client.get('/tasks/overdue?per_page=2&page=4', headers=admin_headers).get_json()
+    assert last['total'] == 5 and last['buckets'] == [] and not last['has_more']
+
+
+def test_invalid_page_is_rejected(client, admin_headers):
+    assert client.get('/tasks/overdue?page=0', headers=admin_headers).status_code == 400
+    assert client.get('/tasks/upcoming?per_page=-1', headers=admin_headers).status_code == 400
@@ -0,0 +1,111 @@
+"""Handler tulis mem-publish event stream setelah commit (app/events.py)."""
+import json
+
+import pytest
+
+
+def drain(subscription):
+    events = []
+    while True:
+        message = subscription.get(timeout=0)
+        if message is None:
+            return events
+        name, data = message.strip().split('\n')
+        events.append((name.removeprefix('event: '), json.loads(data.removeprefix('data: '))))
+
+
+@pytest.fixture
+def subscribe(app):
+    hub = app.extensions['events']
+    return lambda *topics: hub.subscribe(*topics)
+
+
+@pytest.fixture
+def seeded(client, admin_headers):
+    for name in ('K1', 'K2'):
+        assert client.post('/kelas/', json={'name': name}, headers=admin_headers).status_code == 201
+    assert client.post('/projects/', json={
+        'name': 'P', 'start_date': '2026-01-01', 'end_date': '2026-12-31', 'status': 'In Progress'
+    }, headers=admin_headers).status_code == 201
+    for i in range(2):
+        assert client.post('/tasks/', json={
+            'project_id': 1, 'kelas_id': 1, 'title': f'T{i}', 'due_date': '2026-10-01'
+        }, headers=admin_headers).status_code == 201
+
+
+def test_create_task_publishes_created(client, admin_headers, seeded, subscribe):
+    kelas, project = subscribe('kelas:2'), subscribe('project:1')
+    response = client.post('/tasks/', json={
+        'project_id': 1, 'kelas_id': 2, 'title': 'New', 'due_date': '2026-11-01'
+    }, headers=admin_headers)
+
+    assert response.status_code == 201
+    task_id = response.get_json()['task']['id']
+    for subscription in (kelas, project):
+        [(name, data)] = drain(subscription)
+        assert name == 'task.created'
+        assert data['id'] == task_id
+
+
+def test_update_task_publishes_to_old_and_new_kelas(client, admin_headers, seeded, subscribe):
+    old, new = subscribe('kelas:1'), subscribe('kelas:2')
+    response = client.put('/tasks/1', json={'kelas_id': 2, 'title': 'Moved'}, headers=admin_headers)
+
+    assert response.status_code == 200
+    for subscription in (old, new):
+        [(name, data)] = drain(subscription)
+        assert name == 'task.updated'
+        assert data['kelas_id'] == 2
+
+
+def test_update_task_status_publishes_updated(client, admin_headers, seeded, subscribe):
+    kelas = subscribe('kelas:1')
+    response = client.put('/tasks/1/status', json={'status': 'Completed'}, headers=admin_headers)
+
+    assert response.status_code == 200
+    [(name, data)] = drain(kelas)
+    assert (name, data['status']) == ('task.updated', 'Completed')
+
+
+def test_delete_task_publishes_deleted(client, admin_headers, seeded, subscribe):
+    project = subscribe('project:1')
+    assert client.delete('/tasks/2', headers=admin_headers).status_code == 200
+    assert drain(project) == [('task.deleted', {'id': 2, 'project_id': 1, 'kelas_id': 1})]
+
+
+def test_update_kelas_succeeds_without_task_events(client, admin_headers, seeded, subscribe):
+    kelas = subscribe('kelas:1')
+    response = client.put('/kelas/1', json={'name': 'Renamed'}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['kelas'] == {'id': 1, 'name': 'Renamed'}
+    assert drain(kelas) == []
+
+
+def test_delete_kelas_cascade_publishes_grouped_deleted(client, admin_headers, seeded, subscribe):
+    kelas, project = subscribe('kelas:1'), subscribe('project:1')
+    response = client.delete('/kelas/1?cascade=true', headers=admin_headers)
+
+    assert response.status_code == 200
+    for subscription in (kelas, project):
+        [(name, data)] = drain(subscription)
+        assert name == 'tasks.deleted'
+        assert sorted(data['ids']) == [1, 2]
+
+
+def test_delete_project_publishes_grouped_deleted(client, admin_headers, seeded, subscribe):
+    kelas = subscribe('kelas:1')
+    assert client.delete('/projects/1?cascade=true', headers=admin_headers).status_code == 200
+    [(name, data)] = drain(kelas)
+    assert name == 'tasks.deleted'
+    assert sorted(data['ids']) == [1, 2]
+
+
+def test_clone_project_publishes_grouped_created(client, admin_headers, seeded, subscribe):
+    kelas = subscribe('kelas:1')
+    response = client.post('/projects/1/clone', json={'shift_days': 7}, headers=admin_headers)
+
+    assert response.status_code == 201
+    [(name, data)] = drain(kelas)
+    assert name == 'tasks.created'
+    assert len(data['ids']) == 2
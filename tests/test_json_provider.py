@@ -0,0 +1,28 @@
+"""Output JSON FastJSONProvider, dengan dan tanpa orjson."""
+from datetime import date, datetime
+
+import pytest
+
+from app.utils import json_provider
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def provider(request, app, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    elif json_provider.orjson is None:
+        pytest.skip('orjson tidak terpasang')
+    return app.json
+
+
+def test_response_body_is_pinned(app, provider):
+    obj = {'name': 'Kelas Ñandú', 'due_date': date(2026, 1, 2),
+           'created_at': datetime(2026, 1, 2, 3, 4, 5), 'id': 1}
+    with app.app_context():
+        body = provider.response(obj).get_data()
+    assert body == ('{"created_at":"2026-01-02T03:04:05","due_date":"2026-01-02",'
+                    '"id":1,"name":"Kelas Ñandú"}\n').encode('utf-8')
+
+
+def test_ensure_ascii_is_still_honoured(provider):
+    assert provider.dumps('é', ensure_ascii=True) == '"\\u00e9"'